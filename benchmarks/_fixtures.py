@@ -0,0 +1,39 @@
+"""Synthetic flag data shared by the benchmarks and the tests"""
+
+from botw_flag_util import byml
+from botw_flag_util.hashing import get_flag_hash
+
+
+def make_bool_record(
+    name: str, hash: int = None, init_value: int = 0, is_save: bool = False
+) -> dict:
+    """Returns the bgdata record of a bool flag, with the hash of its name unless one is given"""
+    return {
+        "Category": 1,
+        "DataName": name,
+        "DeleteRev": -1,
+        "HashValue": get_flag_hash(name) if hash is None else hash,
+        "InitValue": init_value,
+        "IsEventAssociated": False,
+        "IsOneTrigger": False,
+        "IsProgramReadable": True,
+        "IsProgramWritable": True,
+        "IsSave": is_save,
+        "MaxValue": True,
+        "MinValue": False,
+        "ResetType": 0,
+    }
+
+
+def make_s32_record(name: str, init_value: int = 0) -> dict:
+    """Returns the bgdata record of an s32 flag"""
+    record = make_bool_record(name, init_value=init_value)
+    del record["Category"]
+    record["MaxValue"] = 2147483647
+    record["MinValue"] = 0
+    return record
+
+
+def make_bgdata(records: list, ftype: str = "bool_data") -> bytes:
+    """Returns a little endian bgdata file holding the records of one flag type"""
+    return byml.to_binary({ftype: records}, big_endian=False)
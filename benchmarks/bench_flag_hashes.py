@@ -0,0 +1,50 @@
+"""
+Times hashing the flag names derived from the vanilla actor lists (IsGet_ and
+map object flags) with ctypes, as flags used to, and with botw_flag_util.hashing,
+and checks that all of them agree.
+
+Run from the repository root: python -m benchmarks.bench_flag_hashes
+"""
+
+import timeit
+from ctypes import c_int32
+from zlib import crc32
+
+from botw_flag_util import vanilla_actors
+from botw_flag_util.hashing import get_flag_hash, get_flag_hashes
+
+RUNS = 20
+
+
+def get_hashes_with_ctypes(names: list) -> list:
+    return [c_int32(crc32(name.encode("utf-8"))).value for name in names]
+
+
+def get_hashes_cold(names: list) -> list:
+    get_flag_hash.cache_clear()
+    return [get_flag_hash(name) for name in names]
+
+
+def get_hashes_cached(names: list) -> list:
+    return [get_flag_hash(name) for name in names]
+
+
+def main() -> None:
+    actors = sorted(vanilla_actors["with_flags"] | vanilla_actors["no_flags"])
+    names = [f"IsGet_{actor}" for actor in actors]
+    names += [f"MainField_{actor}_{idx}" for idx, actor in enumerate(actors)]
+    expected = get_hashes_with_ctypes(names)
+    print(f"{len(names)} names")
+    for label, func in (
+        ("ctypes", get_hashes_with_ctypes),
+        ("get_flag_hash, cold", get_hashes_cold),
+        ("get_flag_hash, cached", get_hashes_cached),
+        ("get_flag_hashes", get_flag_hashes),
+    ):
+        assert func(names) == expected
+        elapsed = timeit.timeit(lambda: func(names), number=RUNS) / RUNS
+        print(f"{label + ':':<23}{elapsed * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Measures the memory of 50k flags built from Hashes, half BoolFlags and half
+S32Flags, and times reading attributes from all of them. The same is measured
+for flags laid out as they were before they had __slots__, for comparison.
+
+Run from the repository root: python -m benchmarks.bench_flag_memory
+"""
+
+import time
+import tracemalloc
+
+from oead.byml import Hash, from_binary
+
+from botw_flag_util.flag import BoolFlag, S32Flag
+
+from ._fixtures import make_bgdata, make_bool_record, make_s32_record
+
+COUNT = 50_000
+READS = 10
+
+
+class UnslottedFlag:
+    """A flag as it was before __slots__: its attributes in a __dict__, behind properties"""
+
+    def __init__(self, flag: Hash) -> None:
+        self._data_name = flag["DataName"]
+        self._hash_value = flag["HashValue"].v
+        self._delete_rev = flag["DeleteRev"].v
+        self._is_event_associated = flag["IsEventAssociated"]
+        self._is_one_trigger = flag["IsOneTrigger"]
+        self._is_program_readable = flag["IsProgramReadable"]
+        self._is_program_writable = flag["IsProgramWritable"]
+        self._is_save = flag["IsSave"]
+        self._reset_type = flag["ResetType"].v
+
+    @property
+    def init_value(self) -> int:
+        return self._init_value
+
+    @property
+    def is_save(self) -> bool:
+        return self._is_save
+
+    @property
+    def reset_type(self) -> int:
+        return self._reset_type
+
+
+class UnslottedBoolFlag(UnslottedFlag):
+    def __init__(self, flag: Hash) -> None:
+        super().__init__(flag)
+        self._category = flag["Category"].v
+        self._init_value = flag["InitValue"].v
+        self._max_value = flag["MaxValue"]
+        self._min_value = flag["MinValue"]
+        self._is_revival = False
+
+
+class UnslottedS32Flag(UnslottedFlag):
+    def __init__(self, flag: Hash) -> None:
+        super().__init__(flag)
+        self._init_value = flag["InitValue"].v
+        self._max_value = flag["MaxValue"].v
+        self._min_value = flag["MinValue"].v
+        self._is_revival = False
+
+
+def measure(label: str, hashes: list, bool_class: type, s32_class: type) -> None:
+    tracemalloc.start()
+    flags = [s32_class(flag) if is_s32 else bool_class(flag) for flag, is_s32 in hashes]
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    total = 0
+    for _ in range(READS):
+        for flag in flags:
+            total += flag.init_value + flag.reset_type + flag.is_save
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:9} {allocated / COUNT:.0f} B per flag, "
+        f"{elapsed * 1000:.0f}ms for {COUNT * READS * 3} attribute reads"
+    )
+
+
+def main() -> None:
+    bool_hashes = from_binary(
+        make_bgdata([make_bool_record(f"Flag_{idx}") for idx in range(0, COUNT, 2)])
+    )["bool_data"]
+    s32_hashes = from_binary(
+        make_bgdata([make_s32_record(f"Flag_{idx}") for idx in range(1, COUNT, 2)], "s32_data")
+    )["s32_data"]
+    hashes = [(flag, False) for flag in bool_hashes] + [(flag, True) for flag in s32_hashes]
+
+    measure("unslotted", hashes, UnslottedBoolFlag, UnslottedS32Flag)
+    measure("slotted", hashes, BoolFlag, S32Flag)
+
+
+if __name__ == "__main__":
+    main()
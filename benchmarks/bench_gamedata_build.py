@@ -0,0 +1,59 @@
+"""
+Times building gamedata.ssarc and savedataformat.ssarc from a store of 50k
+synthetic bool flags, and building the same bgdata files in a process pool.
+Building them in a pool with -j was dropped after it was slower on one core;
+this is what to run on a multi-core machine before bringing it back.
+
+Run from the repository root: python -m benchmarks.bench_gamedata_build [processes]
+"""
+
+import sys
+import time
+from math import ceil
+from multiprocessing import Pool
+
+from botw_flag_util import util
+from botw_flag_util.store import FlagStore
+
+from ._fixtures import make_bgdata, make_bool_record
+
+COUNT = 50_000
+
+
+def make_store() -> FlagStore:
+    records = [
+        make_bool_record(f"Benchmark_Flag_{idx}", is_save=bool(idx % 4)) for idx in range(COUNT)
+    ]
+    store = FlagStore(columnar=True)
+    store.add_flags_from_bgdata("bool_data_0", make_bgdata(records))
+    return store
+
+
+def main() -> None:
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    store = make_store()
+
+    start = time.perf_counter()
+    util.make_new_gamedata(store, False)
+    print(f"gamedata:            {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    util.make_new_savedata(store, False, [b"", b""])
+    print(f"savedata:            {time.perf_counter() - start:.2f}s")
+
+    flags = store.get_bgdata_flags("bool_data")
+    chunks = [
+        ("bool_data", flags[idx * 4096 : (idx + 1) * 4096], False)
+        for idx in range(ceil(len(flags) / 4096))
+    ]
+    start = time.perf_counter()
+    serial = [util.make_bgdata_file(*chunk) for chunk in chunks]
+    print(f"bgdata files:        {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    with Pool(processes=processes) as pool:
+        pooled = pool.starmap(util.make_bgdata_file, chunks)
+    print(f"bgdata files, pool:  {time.perf_counter() - start:.2f}s with {processes} processes")
+    assert pooled == serial
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Times FlagGenerator.diff_map() on synthetic map units of 1k to 100k objects.
+A tenth of the stock objects are removed and a tenth of the objects are new,
+and the time per object should stay flat as the maps grow.
+
+Run from the repository root: python -m benchmarks.bench_map_diff
+"""
+
+import random
+import time
+from pathlib import Path
+
+import oead
+
+from botw_flag_util import byml, vanilla_actors
+from botw_flag_util.generator import FlagGenerator
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+def make_obj(hash_id: int, actor: str, rng: random.Random) -> dict:
+    return {
+        "HashId": hash_id,
+        "UnitConfigName": actor,
+        "Translate": [rng.uniform(-5000, 5000), rng.uniform(0, 500), rng.uniform(-4000, 4000)],
+    }
+
+
+def make_maps(size: int, rng: random.Random) -> tuple:
+    """Returns a mod map and its stock map with the given number of objects"""
+    actors = sorted(vanilla_actors["with_flags"])[:50] + ["Obj_NoFlag_Benchmark"]
+    stock = [make_obj(hash_id, rng.choice(actors), rng) for hash_id in range(size)]
+    kept = [obj for obj in stock if rng.random() >= 0.1]
+    added = [make_obj(size + i, rng.choice(actors), rng) for i in range(size - len(kept))]
+    mod = kept + added
+    rng.shuffle(mod)
+    return tuple(
+        oead.byml.from_binary(byml.to_binary({"Objs": objs}, big_endian=False))
+        for objs in (mod, stock)
+    )
+
+
+def main() -> None:
+    rng = random.Random(0)
+    generator = FlagGenerator(Path())
+    for size in SIZES:
+        map_data, stock_map = make_maps(size, rng)
+        start = time.perf_counter()
+        ops = generator.diff_map(map_data, stock_map, "MainField", 1)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{size:>7} objects: {elapsed:.3f}s, {elapsed / size * 1e6:.1f}us per object,"
+            f" {len(ops)} ops"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Times substring searches over 50k synthetic bool flag names by scanning the
+names and through a NameIndex, and reports how many searches it takes for
+building the index to pay off, which store.INDEX_MIN_SEARCHES is based on.
+
+Run from the repository root: python -m benchmarks.bench_name_search
+"""
+
+import random
+import time
+
+from botw_flag_util.search import NameIndex
+from botw_flag_util.store import FlagStore
+
+from ._fixtures import make_bgdata, make_bool_record
+
+COUNT = 50_000
+SEARCHES = 300
+WORDS = ("Npc", "Enemy", "Dungeon", "Clear", "Open", "Talk", "Hyrule", "Kakariko", "Zora")
+WORDS += ("Gerudo", "Item", "Weapon", "Get", "Flag", "Door", "Chest")
+
+
+def main() -> None:
+    rng = random.Random(0)
+    names = sorted({"_".join(rng.sample(WORDS, 3)) + f"_{idx}" for idx in range(COUNT)})
+    queries = [rng.choice(names)[-12:] for _ in range(SEARCHES)]
+    store = FlagStore(columnar=True)
+    store.add_flags_from_bgdata(
+        "bool_data_0", make_bgdata([make_bool_record(name) for name in names])
+    )
+    columns = store._columns("bool_data")
+
+    start = time.perf_counter()
+    expected = [set(columns.find_hashes(query)) for query in queries]
+    scan = (time.perf_counter() - start) / SEARCHES
+    print(f"scan:  {scan * 1000:.2f}ms per search")
+
+    start = time.perf_counter()
+    index = NameIndex(columns.get_names())
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    found = [index.find(query) for query in queries]
+    lookup = (time.perf_counter() - start) / SEARCHES
+    print(f"index: {lookup * 1000:.2f}ms per search, after {build * 1000:.0f}ms to build")
+    assert found == expected
+
+    print(f"the index pays off after {build / (scan - lookup):.0f} searches")
+
+
+if __name__ == "__main__":
+    main()
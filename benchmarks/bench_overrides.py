@@ -0,0 +1,59 @@
+"""
+Times applying overrides.json to 100k BoolFlag names with the compiled
+matchers, against searching every pattern of every property in turn,
+and checks that both give the same values.
+
+Run from the repository root: python -m benchmarks.bench_overrides
+"""
+
+import random
+import re
+import time
+
+from botw_flag_util.flag import BoolFlag
+from botw_flag_util.override import get_override_matcher, get_overrides, resolve_overrides
+
+COUNT = 100_000
+PREFIXES = ("MainField_Obj_", "IsGet_", "Clear_", "Open_", "Npc_", "Enemy_", "Dungeon")
+GROUPS = ("STANDARD_OVERRIDES", "BOOL_OVERRIDES")
+
+
+def scan_overrides(name: str) -> dict:
+    """Applies the overrides to a name the slow way, with every pattern in file order"""
+    r: dict = {}
+    for group in GROUPS:
+        prefix = "OVERRIDE_" if group == "STANDARD_OVERRIDES" else f"OVERRIDE_{group[:-10]}_"
+        for key, patterns in get_overrides()[group].items():
+            for regex, value in patterns.items():
+                if re.search(regex, name):
+                    r[key[len(prefix) :].lower()] = value
+    return r
+
+
+def main() -> None:
+    rng = random.Random(0)
+    names = [f"{rng.choice(PREFIXES)}Benchmark_{i}" for i in range(COUNT)]
+
+    start = time.perf_counter()
+    expected = [scan_overrides(name) for name in names]
+    print(f"pattern scan: {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    matched = [dict(get_override_matcher(BoolFlag).match(name)) for name in names]
+    print(f"matcher:      {time.perf_counter() - start:.3f}s")
+    assert matched == expected
+
+    flags = []
+    for name in names:
+        flag = BoolFlag()
+        flag.data_name = name
+        flags.append(flag)
+    resolve_overrides.cache_clear()
+    start = time.perf_counter()
+    for flag in flags:
+        flag.use_name_to_override_params()
+    print(f"flags:        {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Times testing the actor names of a synthetic ActorInfo of 20k actors against
+the vanilla actor lists, as plain lists and as loaded by botw_flag_util, and
+times FlagGenerator.add_actors_with_life() on that ActorInfo.
+
+Run from the repository root: python -m benchmarks.bench_vanilla_actors
+"""
+
+import random
+import time
+from pathlib import Path
+
+import oead
+
+from botw_flag_util import byml, vanilla_actors
+from botw_flag_util.generator import FlagGenerator
+
+COUNT = 20_000
+
+
+def count_vanilla(names: list, with_flags, no_flags) -> int:
+    return sum(1 for name in names if name in with_flags or name in no_flags)
+
+
+def main() -> None:
+    rng = random.Random(0)
+    vanilla_names = sorted(vanilla_actors["with_flags"]) + sorted(vanilla_actors["no_flags"])
+    names = [
+        rng.choice(vanilla_names) if rng.random() < 0.9 else f"Mod_Actor_{i}" for i in range(COUNT)
+    ]
+
+    lists = [list(vanilla_actors["with_flags"]), list(vanilla_actors["no_flags"])]
+    start = time.perf_counter()
+    expected = count_vanilla(names, *lists)
+    print(f"lists:      {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    found = count_vanilla(names, vanilla_actors["with_flags"], vanilla_actors["no_flags"])
+    print(f"loaded:     {time.perf_counter() - start:.3f}s")
+    assert found == expected
+
+    actorinfo = oead.byml.from_binary(
+        byml.to_binary(
+            {"Actors": [{"name": name, "generalLife": 1} for name in names]}, big_endian=False
+        )
+    )
+    generator = FlagGenerator(Path())
+    start = time.perf_counter()
+    generator.add_actors_with_life(actorinfo)
+    print(f"actorinfo:  {time.perf_counter() - start:.3f}s")
+    assert len(generator.mod_actors_with_life) == len(
+        {name for name in names if name.startswith("Mod_Actor_")}
+    )
+
+
+if __name__ == "__main__":
+    main()
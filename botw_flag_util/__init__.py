@@ -25,7 +25,27 @@ BGDATA_MAPPING = {
     "vector4f_data": "vector4f_data",
 }
 
-vanilla_hash_dict = json.loads((EXEC_DIR / "data/vanilla_hash.json").read_text())
-vanilla_actors = json.loads((EXEC_DIR / "data/vanilla_actors.json").read_text())
-vanilla_shrine_locs = json.loads((EXEC_DIR / "data/vanilla_shrines.json").read_text())
-overrides = json.loads((EXEC_DIR / "data/overrides.json").read_text())
+DATA_FILES = {
+    "vanilla_hash_dict": "vanilla_hash.json",
+    "vanilla_actors": "vanilla_actors.json",
+    "vanilla_shrine_locs": "vanilla_shrines.json",
+}
+
+
+def load_data(name: str):
+    data = json.loads((EXEC_DIR / "data" / DATA_FILES[name]).read_text())
+    if name == "vanilla_actors":
+        data = {category: frozenset(actors) for category, actors in data.items()}
+    return data
+
+
+def __getattr__(name: str):
+    """Loads the bundled data files the first time they are accessed"""
+    if name in DATA_FILES:
+        globals()[name] = load_data(name)
+        return globals()[name]
+    if name == "overrides":
+        from .override import get_overrides
+
+        return get_overrides()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
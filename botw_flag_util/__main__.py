@@ -3,10 +3,18 @@ import shutil
 import time
 from pathlib import Path
 
-from bcml import util as bcmlutil
-from . import util
-from .finder import find
-from .generator import generate
+
+# the commands import bcml and oead, so they are only imported once a command is chosen
+def run_find(args) -> None:
+    from .finder import find
+
+    find(args)
+
+
+def run_generate(args) -> None:
+    from .generator import generate
+
+    generate(args)
 
 
 def main() -> None:
@@ -20,9 +28,27 @@ def main() -> None:
     )
     f_parser.add_argument("directory", help="The root folder of your mod")
     f_parser.add_argument(
-        "flag_name", help="The name (or part of the name) of the flag to search for"
+        "flag_name",
+        nargs="?",
+        help="The name (or part of the name) of the flag to search for",
     )
-    f_parser.set_defaults(func=lambda a: find(a))
+    f_parser.add_argument(
+        "-q",
+        "--queries",
+        action="store",
+        help="A file with one search per line (- for stdin), all resolved in one run",
+        metavar="FILE",
+    )
+    f_parser.add_argument(
+        "-e", "--regex", help="Treat the searches as regular expressions", action="store_true"
+    )
+    f_parser.add_argument(
+        "-d",
+        "--delete",
+        help="Delete the found flags without asking, with a single rewrite of Bootup.pack",
+        action="store_true",
+    )
+    f_parser.set_defaults(func=run_find)
 
     g_parser = subparsers.add_parser(
         "generate", description="Builds GameData and SaveGameData flags", aliases=["g"]
@@ -41,7 +67,22 @@ def main() -> None:
         help="Generate revival flags for actor instances",
         metavar=("MainFieldResetType", "ShrineResetType"),
     )
-    g_parser.set_defaults(func=lambda a: generate(a))
+    g_parser.add_argument(
+        "-j",
+        "--jobs",
+        action="store",
+        default=1,
+        type=int,
+        help="Number of processes to use for loading game data and processing map units",
+        metavar="N",
+    )
+    g_parser.add_argument(
+        "-i",
+        "--incremental",
+        help="Only reprocess map units that changed since the last incremental run",
+        action="store_true",
+    )
+    g_parser.set_defaults(func=run_generate)
 
     for p in [f_parser, g_parser]:
         p.add_argument(
@@ -50,6 +91,16 @@ def main() -> None:
         p.add_argument(
             "-v", "--verbose", help="Give verbose after-action report", action="store_true"
         )
+        p.add_argument(
+            "-c",
+            "--compression-level",
+            action="store",
+            default=None,
+            type=int,
+            choices=range(6, 10),
+            help="Yaz0 compression level, from 6 (fastest) to 9 (smallest), defaults to bcml's",
+            metavar="LEVEL",
+        )
 
     args = parser.parse_args()
     directory: Path = Path(args.directory)
@@ -60,6 +111,8 @@ def main() -> None:
         return
     bootup_path: Path = directory / "content" / "Pack" / "Bootup.pack"
     if not bootup_path.exists():
+        from bcml import util as bcmlutil
+
         bootup_path.parent.mkdir(parents=True, exist_ok=True)
         shutil.copy(bcmlutil.get_game_file("Pack/Bootup.pack"), bootup_path)
     bootup_dir = str(bootup_path).replace("\\", "/")
@@ -0,0 +1,354 @@
+"""
+Reads and writes BYML documents as plain Python values, such as the records made
+by BFUFlag.to_record, without building oead.byml containers.
+
+dicts are hashes, lists (and tuples, when writing) are arrays, and bools, ints,
+floats and strs are Bool, S32, F32 and String nodes. Written documents are byte
+for byte the same as oead.byml.to_binary output for the equivalent document,
+including its sorted string tables and the sharing of identical containers.
+"""
+import struct
+from typing import Dict, Hashable, Iterator, List, Set, Tuple, Union
+
+NODE_STRING = 0xA0
+NODE_ARRAY = 0xC0
+NODE_HASH = 0xC1
+NODE_STRING_TABLE = 0xC2
+NODE_BOOL = 0xD0
+NODE_INT = 0xD1
+NODE_FLOAT = 0xD2
+
+NODE_TYPES = {
+    str: NODE_STRING,
+    list: NODE_ARRAY,
+    tuple: NODE_ARRAY,
+    dict: NODE_HASH,
+    bool: NODE_BOOL,
+    int: NODE_INT,
+    float: NODE_FLOAT,
+}
+CONTAINER_TYPES = (dict, list, tuple)
+# how the value of each node type is packed inline, as a u32 string table index for strings
+VALUE_FORMATS = {
+    NODE_STRING: "I",
+    NODE_ARRAY: "I",
+    NODE_HASH: "I",
+    NODE_BOOL: "I",
+    NODE_INT: "i",
+    NODE_FLOAT: "f",
+}
+
+
+def get_node_type_of(value_type: type) -> int:
+    try:
+        return NODE_TYPES[value_type]
+    except KeyError:
+        raise TypeError(f"{value_type.__name__} values can't be written to BYML.") from None
+
+
+def get_node_type(value) -> int:
+    return get_node_type_of(type(value))
+
+
+class BymlWriter:
+    """
+    Identical containers are only written once, like oead does. Each container is
+    encoded before it's written, and its key for finding identical containers is
+    its encoded data, with +0.0 for any -0.0 (which oead treats as equal), plus
+    the keys of its child containers. Containers holding a NaN are never shared.
+    """
+
+    def __init__(self, big_endian: bool) -> None:
+        self.endian = ">" if big_endian else "<"
+        self.byteorder = "big" if big_endian else "little"
+        self._u32 = struct.Struct(f"{self.endian}I")
+        self._keys: Dict[str, int] = {}
+        self._strings: Dict[str, int] = {}
+        self._hash_layouts: Dict[tuple, tuple] = {}
+        self._offsets: Dict[Hashable, int] = {}
+        self._out = bytearray()
+
+    def _collect_strings(self, value, keys: Set[str], strings: Set[str]) -> None:
+        node_type = get_node_type(value)
+        if node_type == NODE_HASH:
+            keys.update(value)
+            for item in value.values():
+                if type(item) is str:
+                    strings.add(item)
+                elif type(item) in CONTAINER_TYPES:
+                    self._collect_strings(item, keys, strings)
+        elif node_type == NODE_ARRAY:
+            for item in value:
+                if type(item) is str:
+                    strings.add(item)
+                elif type(item) in CONTAINER_TYPES:
+                    self._collect_strings(item, keys, strings)
+
+    def _write_string_table(self, strings: List[str]) -> None:
+        encoded = [string.encode("utf-8") for string in strings]
+        self._out += self._u32.pack(self._get_header(NODE_STRING_TABLE, len(encoded)))
+        offset = 4 + 4 * (len(encoded) + 1)
+        for string in encoded:
+            self._out += self._u32.pack(offset)
+            offset += len(string) + 1
+        self._out += self._u32.pack(offset)
+        for string in encoded:
+            self._out += string + b"\0"
+        self._out += b"\0" * (-len(self._out) % 4)
+
+    def _get_header(self, node_type: int, count: int) -> int:
+        """Returns a u8 node type followed by a u24 count, as a u32 to pack"""
+        return node_type << 24 | count if self.byteorder == "big" else count << 8 | node_type
+
+    def _get_entry(self, key: str, node_type: int) -> int:
+        """Returns a u24 hash key index followed by a u8 node type, as a u32 to pack"""
+        index = self._keys[key]
+        return index << 8 | node_type if self.byteorder == "big" else node_type << 24 | index
+
+    def _get_hash_layout(self, layout_key: tuple) -> tuple:
+        """
+        Returns the sorted keys of a hash with the given keys and value types, a
+        struct that packs the whole node, and the arguments for that struct with
+        the header and the entries already filled in, except for the values
+        """
+        keys = sorted(zip(*layout_key))
+        fmt = [self.endian, "I"]
+        args: list = [self._get_header(NODE_HASH, len(keys))]
+        for key, value_type in keys:
+            node_type = get_node_type_of(value_type)
+            args += [self._get_entry(key, node_type), 0]
+            fmt.append("I" + VALUE_FORMATS[node_type])
+        layout = ([key for key, _ in keys], struct.Struct("".join(fmt)), args)
+        self._hash_layouts[layout_key] = layout
+        return layout
+
+    def _encode(self, value) -> tuple:
+        """
+        Returns the encoded data of a container, with zeroes where the offsets of
+        its child containers go, the positions and encodings of those children,
+        and the key that identical containers share
+        """
+        if type(value) is dict:
+            layout_key = (tuple(value), tuple(map(type, value.values())))
+            layout = self._hash_layouts.get(layout_key) or self._get_hash_layout(layout_key)
+            keys, packer, args = layout
+            args = args.copy()
+            items = [value[key] for key in keys]
+            # the values follow the header and each entry's key index and type
+            value_args = range(2, 2 * len(items) + 1, 2)
+            positions = range(8, 8 * len(items) + 1, 8)
+        else:
+            items = value
+            node_types = bytes(map(get_node_type, items))
+            types_size = len(items) + -len(items) % 4
+            packer = struct.Struct(
+                f"{self.endian}I{types_size}s"
+                + "".join(VALUE_FORMATS[node_type] for node_type in node_types)
+            )
+            args = [self._get_header(NODE_ARRAY, len(items)), node_types] + [0] * len(items)
+            value_args = range(2, len(items) + 2)
+            positions = range(4 + types_size, 4 + types_size + 4 * len(items), 4)
+        children: List[tuple] = []
+        unique = False
+        canonical_floats: List[int] = []
+        for i, item in enumerate(items):
+            arg = value_args[i]
+            item_type = type(item)
+            if item_type is str:
+                args[arg] = self._strings[item]
+            elif item_type in CONTAINER_TYPES:
+                children.append((positions[i], self._encode(item)))
+            else:
+                args[arg] = item
+                if item_type is float and not item:
+                    canonical_floats.append(arg)
+                elif item_type is float and not item == item:
+                    unique = True
+        data = packer.pack(*args)
+        if unique or (children and any(child[2] is None for _, child in children)):
+            return data, children, None
+        key: Hashable = data
+        if canonical_floats:
+            for arg in canonical_floats:
+                args[arg] = 0.0
+            key = packer.pack(*args)
+        if children:
+            key = (key, tuple(child[2] for _, child in children))
+        return data, children, key
+
+    def _write_container(self, encoded: tuple) -> None:
+        out = self._out
+        data, children, _ = encoded
+        start = len(out)
+        out += data
+        for pos, child in children:
+            key = child[2]
+            offset = self._offsets.get(key) if key is not None else None
+            if offset is not None:
+                self._u32.pack_into(out, start + pos, offset)
+                continue
+            offset = len(out)
+            if key is not None:
+                self._offsets[key] = offset
+            self._u32.pack_into(out, start + pos, offset)
+            self._write_container(child)
+
+    def write(self, root: Union[dict, list, tuple]) -> bytes:
+        if not get_node_type(root) in (NODE_HASH, NODE_ARRAY):
+            raise TypeError("The root of a BYML document must be a dict or a list.")
+        keys: Set[str] = set()
+        strings: Set[str] = set()
+        self._collect_strings(root, keys, strings)
+        self._out += b"BY" if self.byteorder == "big" else b"YB"
+        self._out += struct.pack(f"{self.endian}H", 2)
+        self._out += b"\0" * 12
+        if keys:
+            self._u32.pack_into(self._out, 4, len(self._out))
+            sorted_keys = sorted(keys, key=lambda key: key.encode("utf-8"))
+            self._keys = {key: i for i, key in enumerate(sorted_keys)}
+            self._write_string_table(sorted_keys)
+        if strings:
+            self._u32.pack_into(self._out, 8, len(self._out))
+            sorted_strings = sorted(strings, key=lambda string: string.encode("utf-8"))
+            self._strings = {string: i for i, string in enumerate(sorted_strings)}
+            self._write_string_table(sorted_strings)
+        self._u32.pack_into(self._out, 12, len(self._out))
+        self._write_container(self._encode(root))
+        return bytes(self._out)
+
+
+class BymlReader:
+    """
+    Reads the nodes of a BYML document on demand, so the items of an array can be
+    read one at a time without decoding the rest of the document. Hashes with the
+    same keys and value types are decoded with a struct cached for that layout.
+    """
+
+    def __init__(self, data: bytes) -> None:
+        if data[0:2] == b"BY":
+            self.endian = ">"
+        elif data[0:2] == b"YB":
+            self.endian = "<"
+        else:
+            raise ValueError("The data is not a BYML document.")
+        self._data = data
+        self._view = memoryview(data)
+        self._u32 = struct.Struct(f"{self.endian}I")
+        key_table, string_table, self._root = struct.unpack_from(f"{self.endian}3I", data, 4)
+        self._keys = self._read_string_table(key_table) if key_table else []
+        self._strings = self._read_string_table(string_table) if string_table else []
+        self._hash_layouts: Dict[bytes, tuple] = {}
+
+    def _read_header(self, offset: int) -> Tuple[int, int]:
+        header = self._u32.unpack_from(self._data, offset)[0]
+        if self.endian == ">":
+            return header >> 24, header & 0xFFFFFF
+        return header & 0xFF, header >> 8
+
+    def _read_entry(self, entry: int) -> Tuple[int, int]:
+        """Returns the key index and node type of a hash entry"""
+        if self.endian == ">":
+            return entry >> 8, entry & 0xFF
+        return entry & 0xFFFFFF, entry >> 24
+
+    def _read_string_table(self, offset: int) -> List[str]:
+        _, count = self._read_header(offset)
+        offsets = struct.unpack_from(f"{self.endian}{count + 1}I", self._data, offset + 4)
+        return [
+            self._data[offset + offsets[i] : offset + offsets[i + 1] - 1].decode("utf-8")
+            for i in range(count)
+        ]
+
+    def _get_hash_layout(self, entries: bytes) -> tuple:
+        """
+        Returns the keys of a hash with the given entries, a struct that unpacks
+        its values, and the indices of its bool, string and container values
+        """
+        keys: List[str] = []
+        fmt = [self.endian]
+        bools: List[int] = []
+        strings: List[int] = []
+        containers: List[Tuple[int, int]] = []
+        for i, (entry,) in enumerate(struct.iter_unpack(f"{self.endian}I", entries)):
+            key_index, node_type = self._read_entry(entry)
+            if not node_type in VALUE_FORMATS:
+                raise ValueError(f"BYML node type {node_type:#x} is not supported.")
+            keys.append(self._keys[key_index])
+            fmt.append("4x" + VALUE_FORMATS[node_type])
+            if node_type == NODE_BOOL:
+                bools.append(i)
+            elif node_type == NODE_STRING:
+                strings.append(i)
+            elif node_type in (NODE_ARRAY, NODE_HASH):
+                containers.append((i, node_type))
+        layout = (keys, struct.Struct("".join(fmt)), bools, strings, containers)
+        self._hash_layouts[entries] = layout
+        return layout
+
+    def _convert(self, node_type: int, value: int):
+        if node_type == NODE_STRING:
+            return self._strings[value]
+        if node_type == NODE_BOOL:
+            return bool(value)
+        if node_type == NODE_HASH:
+            return self.read_hash(value)
+        if node_type == NODE_ARRAY:
+            return self.read_array(value)
+        return value
+
+    def read_hash(self, offset: int) -> dict:
+        node_type, count = self._read_header(offset)
+        if not node_type == NODE_HASH:
+            raise ValueError(f"The node at {offset:#x} is not a hash.")
+        # every other u32 after the header is an entry's key index and node type
+        entries = self._view[offset + 4 : offset + 4 + 8 * count].cast("I")[::2].tobytes()
+        layout = self._hash_layouts.get(entries) or self._get_hash_layout(entries)
+        keys, unpacker, bools, strings, containers = layout
+        values = list(unpacker.unpack_from(self._data, offset + 4))
+        for i in bools:
+            values[i] = values[i] != 0
+        for i in strings:
+            values[i] = self._strings[values[i]]
+        for i, node_type in containers:
+            values[i] = self._convert(node_type, values[i])
+        return dict(zip(keys, values))
+
+    def iter_array(self, offset: int) -> Iterator:
+        """Yields the items of an array one at a time"""
+        node_type, count = self._read_header(offset)
+        if not node_type == NODE_ARRAY:
+            raise ValueError(f"The node at {offset:#x} is not an array.")
+        node_types = self._data[offset + 4 : offset + 4 + count]
+        values_offset = offset + 4 + count + -count % 4
+        for node_type in set(node_types):
+            if not node_type in VALUE_FORMATS:
+                raise ValueError(f"BYML node type {node_type:#x} is not supported.")
+        values = struct.unpack_from(
+            self.endian + "".join(VALUE_FORMATS[node_type] for node_type in node_types),
+            self._data,
+            values_offset,
+        )
+        for node_type, value in zip(node_types, values):
+            yield self._convert(node_type, value)
+
+    def read_array(self, offset: int) -> list:
+        return list(self.iter_array(offset))
+
+    def iter_root_arrays(self) -> Iterator[Tuple[str, Iterator]]:
+        """
+        Yields the key of each array in the root hash, along with an iterator over
+        its items, like the flag type and the flags of a bgdata file
+        """
+        node_type, count = self._read_header(self._root)
+        if not node_type == NODE_HASH:
+            raise ValueError("The root of the BYML document is not a hash.")
+        entries = struct.unpack_from(f"{self.endian}{2 * count}I", self._data, self._root + 4)
+        for entry, value in zip(entries[::2], entries[1::2]):
+            key_index, node_type = self._read_entry(entry)
+            if node_type == NODE_ARRAY:
+                yield self._keys[key_index], self.iter_array(value)
+
+
+def to_binary(root: Union[dict, list, tuple], big_endian: bool) -> bytes:
+    """Serializes a document of plain Python values to BYML, like oead.byml.to_binary"""
+    return BymlWriter(big_endian).write(root)
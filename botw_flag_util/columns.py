@@ -0,0 +1,353 @@
+from array import array
+from bisect import bisect_right
+from collections.abc import MutableMapping
+from operator import itemgetter
+from oead.byml import Array
+from typing import Dict, Iterable, Iterator, List, Set, Union
+
+from .flag import BFUFlag, BoolFlag, S32Flag, F32Flag
+from .hashing import get_flag_hash, get_flag_hashes
+
+IS_EVENT_ASSOCIATED = 1
+IS_ONE_TRIGGER = 2
+IS_PROGRAM_READABLE = 4
+IS_PROGRAM_WRITABLE = 8
+IS_SAVE = 16
+IS_REVIVAL = 32
+
+# flag types whose values fit in an array, mapped to the array typecode
+SCALAR_TYPECODES = {BoolFlag: "i", S32Flag: "i", F32Flag: "d"}
+# the types that validate_Hash checks for, as plain values read by byml.BymlReader
+RECORD_TYPES = {
+    BFUFlag: {
+        "DeleteRev": int,
+        "IsEventAssociated": bool,
+        "IsOneTrigger": bool,
+        "IsProgramReadable": bool,
+        "IsProgramWritable": bool,
+        "IsSave": bool,
+        "ResetType": int,
+    },
+    BoolFlag: {"InitValue": int, "MaxValue": bool, "MinValue": bool},
+    S32Flag: {"InitValue": int, "MaxValue": int, "MinValue": int},
+    F32Flag: {"InitValue": float, "MaxValue": float, "MinValue": float},
+}
+
+
+class FlagColumns(MutableMapping):
+    """
+    Column-oriented storage for the flags of one flag type, keyed by hash.
+
+    Loaded flags are rows spread over parallel arrays, with the names packed
+    into one null-separated UTF-8 buffer. A flag object is only built when one
+    is requested, and from then on it takes precedence over its row, so any
+    changes made to it are kept. Added flags are only kept as objects.
+
+    A FlagColumns made with a base shares the rows of the base and only keeps
+    its own index and objects, so it can be changed without affecting the base.
+    """
+
+    _index: Dict[int, int]
+    _objects: Dict[int, BFUFlag]
+
+    def __init__(self, flag_class: type, base: "FlagColumns" = None) -> None:
+        self.flag_class = flag_class
+        self._index = {}
+        self._objects = {}
+        if base is not None:
+            self.__dict__.update(
+                {
+                    attr: value
+                    for attr, value in base.__dict__.items()
+                    if attr not in ("_index", "_objects")
+                }
+            )
+            return
+        typecode = SCALAR_TYPECODES.get(flag_class)
+        self._hashes = array("i")
+        self._names = bytearray()
+        self._name_starts = array("I")
+        self._bits = array("B")
+        self._reset_types = array("i")
+        self._delete_revs = array("i")
+        self._categories = array("i") if "category" in flag_class.__slots__ else None
+        self._init_values: Union[array, list] = array(typecode) if typecode else []
+        self._max_values: Union[array, list] = array(typecode) if typecode else []
+        self._min_values: Union[array, list] = array(typecode) if typecode else []
+
+    def __contains__(self, hash: object) -> bool:
+        return hash in self._index
+
+    def __getitem__(self, hash: int) -> BFUFlag:
+        if hash in self._objects:
+            return self._objects[hash]
+        flag = self._materialize(self._index[hash])
+        self._objects[hash] = flag
+        return flag
+
+    def __setitem__(self, hash: int, flag: BFUFlag) -> None:
+        if hash not in self._index:
+            self._index[hash] = -1
+        self._objects[hash] = flag
+
+    def __delitem__(self, hash: int) -> None:
+        del self._index[hash]
+        self._objects.pop(hash, None)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def row_count(self) -> int:
+        return len(self._hashes)
+
+    def _get_name(self, row: int) -> str:
+        end = self._name_starts[row + 1] - 1 if row + 1 < len(self._name_starts) else -1
+        return self._names[self._name_starts[row] : end].decode("utf-8")
+
+    def _materialize(self, row: int) -> BFUFlag:
+        flag = self.flag_class.__new__(self.flag_class)
+        flag.data_name = self._get_name(row)
+        bits = self._bits[row]
+        flag.is_event_associated = bool(bits & IS_EVENT_ASSOCIATED)
+        flag.is_one_trigger = bool(bits & IS_ONE_TRIGGER)
+        flag.is_program_readable = bool(bits & IS_PROGRAM_READABLE)
+        flag.is_program_writable = bool(bits & IS_PROGRAM_WRITABLE)
+        flag.is_save = bool(bits & IS_SAVE)
+        flag.reset_type = self._reset_types[row]
+        flag.delete_rev = self._delete_revs[row]
+        if self.flag_class is BoolFlag:
+            flag.category = self._categories[row]  # type:ignore[index]
+            flag.init_value = self._init_values[row]
+            flag.max_value = bool(self._max_values[row])
+            flag.min_value = bool(self._min_values[row])
+        else:
+            for attr, column in (
+                ("init_value", self._init_values),
+                ("max_value", self._max_values),
+                ("min_value", self._min_values),
+            ):
+                value = column[row]
+                setattr(flag, attr, list(value) if type(value) == list else value)
+        if "is_revival" in self.flag_class.__slots__:
+            flag.is_revival = bool(bits & IS_REVIVAL)
+        return flag
+
+    def _append_row(
+        self,
+        hash: int,
+        name: str,
+        bits: int,
+        reset_type: int,
+        delete_rev: int,
+        category: int,
+        init_value,
+        max_value,
+        min_value,
+    ) -> None:
+        self._index[hash] = len(self._hashes)
+        self._hashes.append(hash)
+        self._name_starts.append(len(self._names))
+        self._names += name.encode("utf-8") + b"\0"
+        self._bits.append(bits)
+        self._reset_types.append(reset_type)
+        self._delete_revs.append(delete_rev)
+        if self._categories is not None:
+            self._categories.append(category)
+        self._init_values.append(init_value)
+        self._max_values.append(max_value)
+        self._min_values.append(min_value)
+
+    def load(self, flags: Array, is_revival: bool, skip=()) -> List[int]:
+        """
+        Appends the flags in a bgdata Array as rows, leaving out the hashes in skip.
+        Returns the HashValues of the loaded flags that don't match their DataNames.
+        """
+        revival_bit = IS_REVIVAL if is_revival else 0
+        mismatched: List[int] = []
+        for flag in flags:
+            hash = flag["HashValue"].v
+            if hash in skip:
+                continue
+            if self.flag_class not in SCALAR_TYPECODES:
+                new_flag = self.flag_class(flag, revival=is_revival)
+                if not new_flag.hash_value == hash:
+                    mismatched.append(hash)
+                self._append_row(
+                    hash,
+                    new_flag.data_name,
+                    get_flag_bits(new_flag),
+                    new_flag.reset_type,
+                    new_flag.delete_rev,
+                    -1,
+                    new_flag.init_value,
+                    new_flag.max_value,
+                    new_flag.min_value,
+                )
+                continue
+            if not BFUFlag.validate_Hash(flag) or not self.flag_class.validate_Hash(flag):
+                raise AttributeError(f"{flag['DataName']} is malformed.")
+            if not get_flag_hash(flag["DataName"]) == hash:
+                mismatched.append(hash)
+            self._append_row(
+                hash,
+                flag["DataName"],
+                flag["IsEventAssociated"]
+                | flag["IsOneTrigger"] << 1
+                | flag["IsProgramReadable"] << 2
+                | flag["IsProgramWritable"] << 3
+                | flag["IsSave"] << 4
+                | revival_bit,
+                flag["ResetType"].v,
+                flag["DeleteRev"].v,
+                flag["Category"].v if "Category" in flag else -1,
+                get_value(flag["InitValue"]),
+                get_value(flag["MaxValue"]),
+                get_value(flag["MinValue"]),
+            )
+        return mismatched
+
+    def load_records(self, records: Iterable[dict], is_revival: bool, skip=()) -> List[int]:
+        """
+        Appends flags read as plain values by byml.BymlReader as rows, leaving out the
+        hashes in skip. Only for the flag types in SCALAR_TYPECODES. Returns the
+        HashValues of the loaded flags that don't match their DataNames.
+        """
+        revival_bit = IS_REVIVAL if is_revival else 0
+        record_types = {**RECORD_TYPES[BFUFlag], **RECORD_TYPES[self.flag_class]}
+        get_values = itemgetter(*record_types)
+        value_types = tuple(record_types.values())
+        has_category = self._categories is not None
+        hashes: List[int] = []
+        names: List[str] = []
+        for record in records:
+            hash = record["HashValue"]
+            if hash in skip:
+                continue
+            if not tuple(map(type, get_values(record))) == value_types or (
+                has_category and "Category" in record and not type(record["Category"]) == int
+            ):
+                raise AttributeError(f"{record['DataName']} is malformed.")
+            hashes.append(hash)
+            names.append(record["DataName"])
+            self._append_row(
+                hash,
+                record["DataName"],
+                record["IsEventAssociated"]
+                | record["IsOneTrigger"] << 1
+                | record["IsProgramReadable"] << 2
+                | record["IsProgramWritable"] << 3
+                | record["IsSave"] << 4
+                | revival_bit,
+                record["ResetType"],
+                record["DeleteRev"],
+                record.get("Category", -1),
+                record["InitValue"],
+                record["MaxValue"],
+                record["MinValue"],
+            )
+        return [
+            hash for hash, name_hash in zip(hashes, get_flag_hashes(names)) if not hash == name_hash
+        ]
+
+    def add_base_rows(self, base: "FlagColumns", start: int) -> None:
+        """
+        Adds the base rows from start onward, as appended by load, to the index. Flags
+        built from earlier rows with the same hashes are dropped from both columns.
+        """
+        rows = {hash: row for hash, row in base._index.items() if row >= start}
+        for hash in rows.keys() & self._objects.keys():
+            del self._objects[hash]
+        for hash in rows.keys() & base._objects.keys():
+            del base._objects[hash]
+        self._index.update(rows)
+
+    def extend(self, other: "FlagColumns") -> None:
+        """Appends the rows of another FlagColumns of the same flag type, as load would"""
+        start = self.row_count
+        names_start = len(self._names)
+        self._index.update({hash: row + start for hash, row in other._index.items()})
+        self._hashes.extend(other._hashes)
+        self._name_starts.extend(name_start + names_start for name_start in other._name_starts)
+        self._names += other._names
+        self._bits.extend(other._bits)
+        self._reset_types.extend(other._reset_types)
+        self._delete_revs.extend(other._delete_revs)
+        if self._categories is not None:
+            self._categories.extend(other._categories)  # type:ignore[arg-type]
+        self._init_values.extend(other._init_values)  # type:ignore[arg-type]
+        self._max_values.extend(other._max_values)  # type:ignore[arg-type]
+        self._min_values.extend(other._min_values)  # type:ignore[arg-type]
+
+    def find_hashes(self, search: str) -> List[int]:
+        """Returns the hashes of the flags whose names contain the passed string"""
+        key = search.encode("utf-8")
+        if not key:
+            return list(self._index)
+        rows: Set[int] = set()
+        pos = self._names.find(key)
+        while pos > -1:
+            row = bisect_right(self._name_starts, pos) - 1
+            rows.add(row)
+            if row + 1 == len(self._name_starts):
+                break
+            pos = self._names.find(key, self._name_starts[row + 1])
+        return [
+            hash
+            for hash, row in self._index.items()
+            if (search in self._objects[hash].data_name if hash in self._objects else row in rows)
+        ]
+
+    def get_names(self) -> Dict[int, str]:
+        """Returns the name of every flag by hash, without building the flags"""
+        return {
+            hash: self._objects[hash].data_name if hash in self._objects else self._get_name(row)
+            for hash, row in self._index.items()
+        }
+
+    def get_flags(self, revival: bool = None) -> List[BFUFlag]:
+        """Returns the flags, only revival or non-revival ones if specified, without keeping them"""
+        r: List[BFUFlag] = []
+        for hash, row in self._index.items():
+            if hash in self._objects:
+                flag = self._objects[hash]
+                if revival is not None and not flag.is_revival == revival:
+                    continue
+            else:
+                if revival is not None and not bool(self._bits[row] & IS_REVIVAL) == revival:
+                    continue
+                flag = self._materialize(row)
+            r.append(flag)
+        return r
+
+    def get_sv_flags(self, ignored: List[str]) -> List[BFUFlag]:
+        """Returns the save flags whose names aren't ignored, without keeping them"""
+        r: List[BFUFlag] = []
+        for hash, row in self._index.items():
+            if hash in self._objects:
+                flag = self._objects[hash]
+            elif self._bits[row] & IS_SAVE:
+                flag = self._materialize(row)
+            else:
+                continue
+            if flag.is_save and not flag.data_name in ignored:
+                r.append(flag)
+        return r
+
+
+def get_flag_bits(flag: BFUFlag) -> int:
+    return (
+        flag.is_event_associated * IS_EVENT_ASSOCIATED
+        | flag.is_one_trigger * IS_ONE_TRIGGER
+        | flag.is_program_readable * IS_PROGRAM_READABLE
+        | flag.is_program_writable * IS_PROGRAM_WRITABLE
+        | flag.is_save * IS_SAVE
+        | flag.is_revival * IS_REVIVAL
+    )
+
+
+def get_value(value):
+    return value if type(value) == bool else value.v
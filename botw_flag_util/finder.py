@@ -1,33 +1,133 @@
-from oead.yaz0 import compress
+import re
+import sys
 from pathlib import Path
+from typing import Dict, List, Pattern
 
 from . import util
 from .flag import BFUFlag
 from .store import FlagStore
 
 
+def read_queries(path: str) -> List[str]:
+    """Reads one search per line from a file, or from stdin if path is -, skipping # comments"""
+    text = sys.stdin.read() if path == "-" else Path(path).read_text(encoding="utf-8")
+    return [
+        line.strip()
+        for line in text.splitlines()
+        if line.strip() and not line.strip().startswith("#")
+    ]
+
+
+def find_flags(
+    bgdata: FlagStore, queries: List[str], regex: bool = False
+) -> Dict[str, List[BFUFlag]]:
+    """
+    Returns the flags matching any of the searches by flag type, each flag only once.
+    Raises a ValueError naming the search if one of them is not a valid regex.
+    """
+    found: Dict[str, List[BFUFlag]] = {}
+    patterns: Dict[str, Pattern] = {}
+    if regex:
+        for query in queries:
+            try:
+                patterns[query] = re.compile(query)
+            except re.error as e:
+                raise ValueError(f"{query} is not a valid regular expression: {e}") from e
+    bgdata.queue_searches(len(queries))
+    for ftype in util.BGDATA_TYPES:
+        found[ftype] = []
+        seen: set = set()
+        for query in queries:
+            if regex:
+                flags = bgdata.find_all_regex(ftype, patterns[query])
+            else:
+                flags = bgdata.find_all(ftype, query)
+            for flag in flags:
+                if not flag.hash_value in seen:
+                    seen.add(flag.hash_value)
+                    found[ftype].append(flag)
+    return found
+
+
+def print_flags(found: Dict[str, List[BFUFlag]]) -> None:
+    for ftype, flags in found.items():
+        for flag in flags:
+            if flag.is_save:
+                string = f"{flag.data_name} in {ftype} and in game_data.sav"
+            else:
+                string = f"{flag.data_name} in {ftype}"
+            print(string)
+
+
+def delete_flags(
+    session: util.BootupSession,
+    bgdata: FlagStore,
+    found: Dict[str, List[BFUFlag]],
+    bigendian: bool,
+) -> None:
+    """Removes the found flags and rewrites the game data and save data once for all of them"""
+    for ftype, flags in found.items():
+        for flag in flags:
+            bgdata.remove(ftype, flag.hash_value)
+    with session:
+        orig_files = session.get_last_two_savedata_files()
+        session.set_file(
+            "GameData/gamedata.ssarc",
+            util.make_new_gamedata(bgdata, bigendian),
+            compress=True,
+        )
+        session.set_file(
+            "GameData/savedataformat.ssarc",
+            util.make_new_savedata(bgdata, bigendian, orig_files),
+            compress=True,
+        )
+        session.save()
+
+
 def find(args):
+    if args.queries:
+        queries = read_queries(args.queries)
+        if args.flag_name:
+            queries.insert(0, args.flag_name)
+    elif args.flag_name:
+        queries = [args.flag_name]
+    else:
+        print("Please enter a flag name to search for, or a file of searches with --queries.")
+        return
+    queries = list(dict.fromkeys(queries))
+    batch = bool(args.queries or args.delete)
+
     util.root_dir(args.directory)
-    gamedata_sarc = util.get_gamedata_sarc()
-    bgdata = FlagStore()
-    for bgdata_name, bgdata_hash in map(util.unpack_oead_file, gamedata_sarc.get_files()):
-        bgdata.add_flags_from_Hash(bgdata_name, bgdata_hash)
+    session = util.BootupSession(compression_level=args.compression_level)
+    bgdata = FlagStore(columnar=True)
+    session.add_gamedata_flags(bgdata)
 
-    search_name = args.flag_name
-    found: dict = {}
+    try:
+        found = find_flags(bgdata, queries, args.regex)
+    except ValueError as e:
+        print(e)
+        return
     numfound = 0
     numsv = 0
-    for ftype in util.BGDATA_TYPES:
-        found[ftype] = bgdata.find_all(ftype, search_name)
-        numfound += len(found[ftype])
     for _, flags in found.items():
+        numfound += len(flags)
         for flag in flags:
             if flag.is_save:
                 numsv += 1
 
+    search_name = queries[0] if len(queries) == 1 else f"{len(queries)} searches"
     print(
         f"\n{numfound} gamedata flags and {numsv} savedata flags were found that matched {search_name}."
     )
+
+    if batch:
+        if args.verbose:
+            print_flags(found)
+        if args.delete and numfound:
+            delete_flags(session, bgdata, found, args.bigendian)
+            print(f"Deleted {numfound} gamedata flags and {numsv} savedata flags.")
+        return
+
     print("\nOptions:")
     print("v - View the full flag names, files, and indices in their files")
     print("d - Delete these flags and exit")
@@ -37,28 +137,10 @@ def find(args):
         selection = input("\nPlease choose an option(v/d/x):")
 
         if selection == "v":
-            for ftype, flags in found.items():
-                for flag in flags:
-                    if flag.is_save:
-                        string = f"{flag.data_name} in {ftype} and in game_data.sav"
-                    else:
-                        string = f"{flag.data_name} in {ftype}"
-                    print(string)
+            print_flags(found)
 
         elif selection == "d":
-            for ftype, flags in found.items():
-                for flag in flags:
-                    bgdata.remove(ftype, flag.hash_value)
-            files_to_write: list = []
-            files_to_write.append("GameData/gamedata.ssarc")
-            files_to_write.append("GameData/savedataformat.ssarc")
-            orig_files = util.get_last_two_savedata_files()
-            datas_to_write: list = []
-            datas_to_write.append(compress(util.make_new_gamedata(bgdata, args.bigendian)))
-            datas_to_write.append(
-                compress(util.make_new_savedata(bgdata, args.bigendian, orig_files))
-            )
-            util.inject_files_into_bootup(files_to_write, datas_to_write)
+            delete_flags(session, bgdata, found, args.bigendian)
             return
 
         elif selection == "x":
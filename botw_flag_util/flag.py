@@ -1,4 +1,3 @@
-from ctypes import c_int32
 from enum import Enum
 from oead import (
     S32,
@@ -11,14 +10,25 @@ from oead import (
     Vector4f,
 )
 from oead.byml import Hash, Array
-from typing import List, Tuple
-from zlib import crc32
-import re
 
-from . import overrides
+from .hashing import get_flag_hash
+from .override import resolve_overrides
 
 
 class BFUFlag:
+    OVERRIDE_GROUP = "STANDARD_OVERRIDES"
+    __slots__ = (
+        "_data_name",
+        "_hash_value",
+        "delete_rev",
+        "is_event_associated",
+        "is_one_trigger",
+        "is_program_readable",
+        "is_program_writable",
+        "is_save",
+        "reset_type",
+    )
+
     def __init__(self, flag: Hash = None) -> None:
         self.data_name = ""
         self.delete_rev = -1
@@ -106,6 +116,33 @@ class BFUFlag:
         r["HashValue"] = S32(self.hash_value)
         return r
 
+    def to_record(self) -> dict:
+        """Converts flag to a dict of plain values laid out like to_Hash, for byml.to_binary"""
+        return {
+            "DataName": self.data_name,
+            "DeleteRev": int(self.delete_rev),
+            "HashValue": int(self.hash_value),
+            "IsEventAssociated": self.is_event_associated,
+            "IsOneTrigger": self.is_one_trigger,
+            "IsProgramReadable": self.is_program_readable,
+            "IsProgramWritable": self.is_program_writable,
+            "IsSave": self.is_save,
+            "ResetType": int(self.reset_type),
+        }
+
+    def to_sv_record(self) -> dict:
+        """Converts flag to a dict of plain values laid out like to_sv_Hash, for byml.to_binary"""
+        return {"DataName": self.data_name, "HashValue": int(self.hash_value)}
+
+    def copy(self) -> "BFUFlag":
+        """Returns a copy of the flag that can be changed without affecting this one"""
+        r = type(self).__new__(type(self))
+        for cls in type(self).__mro__[:-1]:
+            for attr in cls.__slots__:
+                value = getattr(self, attr)
+                setattr(r, attr, list(value) if type(value) == list else value)
+        return r
+
     def exists(self) -> bool:
         """Returns True if the flag contains any data"""
         return not self.hash_value == 0
@@ -121,68 +158,12 @@ class BFUFlag:
     @data_name.setter
     def data_name(self, name: str) -> None:
         self._data_name = name
-        self._hash_value = c_int32(crc32(name.encode("utf-8"))).value
-
-    @property
-    def delete_rev(self) -> int:
-        return self._delete_rev
-
-    @delete_rev.setter
-    def delete_rev(self, drev: int) -> None:
-        self._delete_rev = drev
+        self._hash_value = get_flag_hash(name)
 
     @property
     def hash_value(self) -> int:
         return self._hash_value
 
-    @property
-    def is_event_associated(self) -> bool:
-        return self._is_event_associated
-
-    @is_event_associated.setter
-    def is_event_associated(self, event_assoc: bool) -> None:
-        self._is_event_associated = event_assoc
-
-    @property
-    def is_one_trigger(self) -> bool:
-        return self._is_one_trigger
-
-    @is_one_trigger.setter
-    def is_one_trigger(self, is_one: bool) -> None:
-        self._is_one_trigger = is_one
-
-    @property
-    def is_program_readable(self) -> bool:
-        return self._is_program_readable
-
-    @is_program_readable.setter
-    def is_program_readable(self, is_read: bool) -> None:
-        self._is_program_readable = is_read
-
-    @property
-    def is_program_writable(self) -> bool:
-        return self._is_program_writable
-
-    @is_program_writable.setter
-    def is_program_writable(self, is_write: bool) -> None:
-        self._is_program_writable = is_write
-
-    @property
-    def is_save(self) -> bool:
-        return self._is_save
-
-    @is_save.setter
-    def is_save(self, save: bool) -> None:
-        self._is_save = save
-
-    @property
-    def reset_type(self) -> int:
-        return self._reset_type
-
-    @reset_type.setter
-    def reset_type(self, reset_type: int) -> None:
-        self._reset_type = reset_type
-
     @property
     def is_revival(self) -> bool:
         return False
@@ -195,28 +176,14 @@ class BFUFlag:
         that certain values that should always be the same for
         certain flag types are upheld.
         """
-        OVERRIDES = overrides["STANDARD_OVERRIDES"]
-        for regex, value in OVERRIDES["OVERRIDE_IS_EVENT_ASSOCIATED"].items():
-            if re.search(regex, self.data_name):
-                self.is_event_associated = value
-        for regex, value in OVERRIDES["OVERRIDE_IS_ONE_TRIGGER"].items():
-            if re.search(regex, self.data_name):
-                self.is_one_trigger = value
-        for regex, value in OVERRIDES["OVERRIDE_IS_PROGRAM_READABLE"].items():
-            if re.search(regex, self.data_name):
-                self.is_program_readable = value
-        for regex, value in OVERRIDES["OVERRIDE_IS_PROGRAM_WRITABLE"].items():
-            if re.search(regex, self.data_name):
-                self.is_program_writable = value
-        for regex, value in OVERRIDES["OVERRIDE_IS_SAVE"].items():
-            if re.search(regex, self.data_name):
-                self.is_save = value
-        for regex, value in OVERRIDES["OVERRIDE_RESET_TYPE"].items():
-            if re.search(regex, self.data_name):
-                self.reset_type = value
+        for prop, value in resolve_overrides(type(self), self.data_name):
+            setattr(self, prop, value)
 
 
 class BoolFlag(BFUFlag):
+    OVERRIDE_GROUP = "BOOL_OVERRIDES"
+    __slots__ = ("category", "init_value", "max_value", "min_value", "is_revival")
+
     def __init__(self, flag: Hash = None, **kwargs) -> None:
         super(BoolFlag, self).__init__(flag=flag)
         self.category = -1
@@ -285,65 +252,20 @@ class BoolFlag(BFUFlag):
         r["MinValue"] = self.min_value
         return r
 
-    @property
-    def category(self) -> int:
-        return self._category
-
-    @category.setter
-    def category(self, value: int) -> None:
-        self._category = value
-
-    @property
-    def init_value(self) -> int:
-        return self._init_value
-
-    @init_value.setter
-    def init_value(self, value: bool) -> None:
-        self._init_value = value
-
-    @property
-    def max_value(self) -> bool:
-        return self._max_value
-
-    @max_value.setter
-    def max_value(self, value: bool) -> None:
-        self._max_value = value
-
-    @property
-    def min_value(self) -> bool:
-        return self._min_value
-
-    @min_value.setter
-    def min_value(self, value: bool) -> None:
-        self._min_value = value
-
-    @property
-    def is_revival(self) -> bool:
-        return self._revival
-
-    @is_revival.setter
-    def is_revival(self, revival: bool) -> None:
-        self._revival = revival
-
-    def use_name_to_override_params(self) -> None:
-        """
-        Sets flag parameters to those mandated by the overrides.
-        In general, this function should always be called right
-        before finalizing the flag creation/changes to ensure
-        that certain values that should always be the same for
-        certain flag types are upheld.
-        """
-        super(BoolFlag, self).use_name_to_override_params()
-        OVERRIDES = overrides["BOOL_OVERRIDES"]
-        for regex, value in OVERRIDES["OVERRIDE_BOOL_CATEGORY"].items():
-            if re.search(regex, self.data_name):
-                self.category = value
-        for regex, value in OVERRIDES["OVERRIDE_BOOL_INIT_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.init_value = value
+    def to_record(self) -> dict:
+        r = super(BoolFlag, self).to_record()
+        if not self.category == -1:
+            r["Category"] = int(self.category)
+        r["InitValue"] = int(self.init_value)
+        r["MaxValue"] = self.max_value
+        r["MinValue"] = self.min_value
+        return r
 
 
 class BoolArrayFlag(BFUFlag):
+    OVERRIDE_GROUP = "BOOL_ARRAY_OVERRIDES"
+    __slots__ = ("init_value", "max_value", "min_value")
+
     def __init__(self, flag: Hash = None, **kwargs) -> None:
         super(BoolArrayFlag, self).__init__(flag=flag)
         self.init_value = [0]
@@ -411,52 +333,18 @@ class BoolArrayFlag(BFUFlag):
         r["MinValue"] = self.min_value
         return r
 
-    @property
-    def init_value(self) -> List[int]:
-        return self._init_value
-
-    @init_value.setter
-    def init_value(self, value: List[int]) -> None:
-        self._init_value = value
-
-    @property
-    def max_value(self) -> bool:
-        return self._max_value
-
-    @max_value.setter
-    def max_value(self, value: bool) -> None:
-        self._max_value = value
-
-    @property
-    def min_value(self) -> bool:
-        return self._min_value
-
-    @min_value.setter
-    def min_value(self, value: bool) -> None:
-        self._min_value = value
-
-    def use_name_to_override_params(self) -> None:
-        """
-        Sets flag parameters to those mandated by the overrides.
-        In general, this function should always be called right
-        before finalizing the flag creation/changes to ensure
-        that certain values that should always be the same for
-        certain flag types are upheld.
-        """
-        super(BoolArrayFlag, self).use_name_to_override_params()
-        OVERRIDES = overrides["BOOL_ARRAY_OVERRIDES"]
-        for regex, value in OVERRIDES["OVERRIDE_BOOL_ARRAY_INIT_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.init_value = value
-        for regex, value in OVERRIDES["OVERRIDE_BOOL_ARRAY_MAX_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.max_value = value
-        for regex, value in OVERRIDES["OVERRIDE_BOOL_ARRAY_MIN_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.min_value = value
+    def to_record(self) -> dict:
+        r = super(BoolArrayFlag, self).to_record()
+        r["InitValue"] = [{"Values": [int(value) for value in self.init_value]}]
+        r["MaxValue"] = self.max_value
+        r["MinValue"] = self.min_value
+        return r
 
 
 class S32Flag(BFUFlag):
+    OVERRIDE_GROUP = "S32_OVERRIDES"
+    __slots__ = ("init_value", "max_value", "min_value", "is_revival")
+
     def __init__(self, flag: Hash = None, **kwargs) -> None:
         super(S32Flag, self).__init__(flag=flag)
         self.init_value = 0
@@ -466,9 +354,9 @@ class S32Flag(BFUFlag):
         if flag:
             if not S32Flag.validate_Hash(flag):
                 raise AttributeError(f"{flag['DataName']} is malformed.")
-            self._init_value = flag["InitValue"].v
-            self._max_value = flag["MaxValue"].v
-            self._min_value = flag["MinValue"].v
+            self.init_value = flag["InitValue"].v
+            self.max_value = flag["MaxValue"].v
+            self.min_value = flag["MinValue"].v
 
     def __eq__(self, other):
         if not type(other) == S32Flag:
@@ -512,65 +400,23 @@ class S32Flag(BFUFlag):
 
     def to_Hash(self) -> Hash:
         r = super(S32Flag, self).to_Hash()
-        r["InitValue"] = S32(self._init_value)
-        r["MaxValue"] = S32(self._max_value)
-        r["MinValue"] = S32(self._min_value)
+        r["InitValue"] = S32(self.init_value)
+        r["MaxValue"] = S32(self.max_value)
+        r["MinValue"] = S32(self.min_value)
         return r
 
-    @property
-    def init_value(self) -> int:
-        return self._init_value
-
-    @init_value.setter
-    def init_value(self, value: int) -> None:
-        self._init_value = value
-
-    @property
-    def max_value(self) -> int:
-        return self._max_value
-
-    @max_value.setter
-    def max_value(self, value: int) -> None:
-        self._max_value = value
-
-    @property
-    def min_value(self) -> int:
-        return self._min_value
-
-    @min_value.setter
-    def min_value(self, value: int) -> None:
-        self._min_value = value
-
-    @property
-    def is_revival(self) -> bool:
-        return self._revival
-
-    @is_revival.setter
-    def is_revival(self, revival: bool) -> None:
-        self._revival = revival
-
-    def use_name_to_override_params(self) -> None:
-        """
-        Sets flag parameters to those mandated by the overrides.
-        In general, this function should always be called right
-        before finalizing the flag creation/changes to ensure
-        that certain values that should always be the same for
-        certain flag types are upheld.
-        """
-        super(S32Flag, self).use_name_to_override_params()
-        OVERRIDES = overrides["S32_OVERRIDES"]
-        for regex, value in OVERRIDES["OVERRIDE_S32_INIT_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.init_value = value
-        for regex, value in OVERRIDES["OVERRIDE_S32_MAX_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.max_value = value
-        for regex, value in OVERRIDES["OVERRIDE_S32_MIN_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.min_value = value
+    def to_record(self) -> dict:
+        r = super(S32Flag, self).to_record()
+        r["InitValue"] = int(self.init_value)
+        r["MaxValue"] = int(self.max_value)
+        r["MinValue"] = int(self.min_value)
+        return r
 
 
 class S32ArrayFlag(BFUFlag):
+    OVERRIDE_GROUP = "S32_ARRAY_OVERRIDES"
+    __slots__ = ("init_value", "max_value", "min_value")
+
     def __init__(self, flag: Hash = None, **kwargs) -> None:
         super(S32ArrayFlag, self).__init__(flag=flag)
         self.init_value = [0]
@@ -638,52 +484,18 @@ class S32ArrayFlag(BFUFlag):
         r["MinValue"] = S32(self.min_value)
         return r
 
-    @property
-    def init_value(self) -> List[int]:
-        return self._init_value
-
-    @init_value.setter
-    def init_value(self, value: List[int]) -> None:
-        self._init_value = value
-
-    @property
-    def max_value(self) -> int:
-        return self._max_value
-
-    @max_value.setter
-    def max_value(self, value: int) -> None:
-        self._max_value = value
-
-    @property
-    def min_value(self) -> int:
-        return self._min_value
-
-    @min_value.setter
-    def min_value(self, value: int) -> None:
-        self._min_value = value
-
-    def use_name_to_override_params(self) -> None:
-        """
-        Sets flag parameters to those mandated by the overrides.
-        In general, this function should always be called right
-        before finalizing the flag creation/changes to ensure
-        that certain values that should always be the same for
-        certain flag types are upheld.
-        """
-        super(S32ArrayFlag, self).use_name_to_override_params()
-        OVERRIDES = overrides["S32_ARRAY_OVERRIDES"]
-        for regex, value in OVERRIDES["OVERRIDE_S32_ARRAY_INIT_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.init_value = value
-        for regex, value in OVERRIDES["OVERRIDE_S32_ARRAY_MAX_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.max_value = value
-        for regex, value in OVERRIDES["OVERRIDE_S32_ARRAY_MIN_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.min_value = value
+    def to_record(self) -> dict:
+        r = super(S32ArrayFlag, self).to_record()
+        r["InitValue"] = [{"Values": [int(value) for value in self.init_value]}]
+        r["MaxValue"] = int(self.max_value)
+        r["MinValue"] = int(self.min_value)
+        return r
 
 
 class F32Flag(BFUFlag):
+    OVERRIDE_GROUP = "F32_OVERRIDES"
+    __slots__ = ("init_value", "max_value", "min_value")
+
     def __init__(self, flag: Hash = None, **kwargs) -> None:
         super(F32Flag, self).__init__(flag=flag)
         self.init_value = 0.0
@@ -743,52 +555,18 @@ class F32Flag(BFUFlag):
         r["MinValue"] = F32(self.min_value)
         return r
 
-    @property
-    def init_value(self) -> float:
-        return self._init_value
-
-    @init_value.setter
-    def init_value(self, value: float) -> None:
-        self._init_value = value
-
-    @property
-    def max_value(self) -> float:
-        return self._max_value
-
-    @max_value.setter
-    def max_value(self, value: float) -> None:
-        self._max_value = value
-
-    @property
-    def min_value(self) -> float:
-        return self._min_value
-
-    @min_value.setter
-    def min_value(self, value: float) -> None:
-        self._min_value = value
-
-    def use_name_to_override_params(self) -> None:
-        """
-        Sets flag parameters to those mandated by the overrides.
-        In general, this function should always be called right
-        before finalizing the flag creation/changes to ensure
-        that certain values that should always be the same for
-        certain flag types are upheld.
-        """
-        super(F32Flag, self).use_name_to_override_params()
-        OVERRIDES = overrides["F32_OVERRIDES"]
-        for regex, value in OVERRIDES["OVERRIDE_F32_INIT_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.init_value = value
-        for regex, value in OVERRIDES["OVERRIDE_F32_MAX_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.max_value = value
-        for regex, value in OVERRIDES["OVERRIDE_F32_MIN_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.min_value = value
+    def to_record(self) -> dict:
+        r = super(F32Flag, self).to_record()
+        r["InitValue"] = float(self.init_value)
+        r["MaxValue"] = float(self.max_value)
+        r["MinValue"] = float(self.min_value)
+        return r
 
 
 class F32ArrayFlag(BFUFlag):
+    OVERRIDE_GROUP = "F32_ARRAY_OVERRIDES"
+    __slots__ = ("init_value", "max_value", "min_value")
+
     def __init__(self, flag: Hash = None, **kwargs) -> None:
         super(F32ArrayFlag, self).__init__(flag=flag)
         self.init_value = [0.0]
@@ -856,52 +634,18 @@ class F32ArrayFlag(BFUFlag):
         r["MinValue"] = F32(self.min_value)
         return r
 
-    @property
-    def init_value(self) -> List[float]:
-        return self._init_value
-
-    @init_value.setter
-    def init_value(self, value: List[float]) -> None:
-        self._init_value = value
-
-    @property
-    def max_value(self) -> float:
-        return self._max_value
-
-    @max_value.setter
-    def max_value(self, value: float) -> None:
-        self._max_value = value
-
-    @property
-    def min_value(self) -> float:
-        return self._min_value
-
-    @min_value.setter
-    def min_value(self, value: float) -> None:
-        self._min_value = value
-
-    def use_name_to_override_params(self) -> None:
-        """
-        Sets flag parameters to those mandated by the overrides.
-        In general, this function should always be called right
-        before finalizing the flag creation/changes to ensure
-        that certain values that should always be the same for
-        certain flag types are upheld.
-        """
-        super(F32ArrayFlag, self).use_name_to_override_params()
-        OVERRIDES = overrides["F32_ARRAY_OVERRIDES"]
-        for regex, value in OVERRIDES["OVERRIDE_F32_ARRAY_INIT_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.init_value = value
-        for regex, value in OVERRIDES["OVERRIDE_F32_ARRAY_MAX_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.max_value = value
-        for regex, value in OVERRIDES["OVERRIDE_F32_ARRAY_MIN_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.min_value = value
+    def to_record(self) -> dict:
+        r = super(F32ArrayFlag, self).to_record()
+        r["InitValue"] = [{"Values": [float(value) for value in self.init_value]}]
+        r["MaxValue"] = float(self.max_value)
+        r["MinValue"] = float(self.min_value)
+        return r
 
 
 class StringFlag(BFUFlag):
+    OVERRIDE_GROUP = "STRING_OVERRIDES"
+    __slots__ = ("init_value", "max_value", "min_value")
+
     def __init__(self, flag: Hash = None, **kwargs) -> None:
         super(StringFlag, self).__init__(flag=flag)
         self.init_value = ""
@@ -958,52 +702,17 @@ class StringFlag(BFUFlag):
         r = super(StringFlag, self).to_Hash()
         return r
 
-    @property
-    def init_value(self) -> str:
-        return self._init_value
-
-    @init_value.setter
-    def init_value(self, value: str) -> None:
-        self._init_value = value
-
-    @property
-    def max_value(self) -> str:
-        return self._max_value
-
-    @max_value.setter
-    def max_value(self, value: str) -> None:
-        self._max_value = value
-
-    @property
-    def min_value(self) -> str:
-        return self._min_value
-
-    @min_value.setter
-    def min_value(self, value: str) -> None:
-        self._min_value = value
-
-    def use_name_to_override_params(self) -> None:
-        """
-        Sets flag parameters to those mandated by the overrides.
-        In general, this function should always be called right
-        before finalizing the flag creation/changes to ensure
-        that certain values that should always be the same for
-        certain flag types are upheld.
-        """
-        super(StringFlag, self).use_name_to_override_params()
-        OVERRIDES = overrides["STRING_OVERRIDES"]
-        for regex, value in OVERRIDES["OVERRIDE_STRING_INIT_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.init_value = value
-        for regex, value in OVERRIDES["OVERRIDE_STRING_MAX_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.max_value = value
-        for regex, value in OVERRIDES["OVERRIDE_STRING_MIN_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.min_value = value
+    def to_record(self) -> dict:
+        r = super(StringFlag, self).to_record()
+        r["InitValue"] = self.init_value
+        r["MaxValue"] = self.max_value
+        r["MinValue"] = self.min_value
+        return r
 
 
 class String32Flag(StringFlag):
+    __slots__ = ()
+
     def __init__(self, flag: Hash = None, **kwargs) -> None:
         super(String32Flag, self).__init__(flag=flag)
 
@@ -1019,6 +728,8 @@ class String32Flag(StringFlag):
 
 
 class String64Flag(StringFlag):
+    __slots__ = ()
+
     def __init__(self, flag: Hash = None, **kwargs) -> None:
         super(String64Flag, self).__init__(flag=flag)
 
@@ -1034,6 +745,8 @@ class String64Flag(StringFlag):
 
 
 class String256Flag(StringFlag):
+    __slots__ = ()
+
     def __init__(self, flag: Hash = None, **kwargs) -> None:
         super(String256Flag, self).__init__(flag=flag)
 
@@ -1049,6 +762,9 @@ class String256Flag(StringFlag):
 
 
 class StringArrayFlag(BFUFlag):
+    OVERRIDE_GROUP = "STRING_ARRAY_OVERRIDES"
+    __slots__ = ("init_value", "max_value", "min_value")
+
     def __init__(self, flag: Hash = None, **kwargs) -> None:
         super(StringArrayFlag, self).__init__(flag=flag)
         self.init_value = [""]
@@ -1109,52 +825,17 @@ class StringArrayFlag(BFUFlag):
         r = super(StringArrayFlag, self).to_Hash()
         return r
 
-    @property
-    def init_value(self) -> List[str]:
-        return self._init_value
-
-    @init_value.setter
-    def init_value(self, value: List[str]) -> None:
-        self._init_value = value
-
-    @property
-    def max_value(self) -> str:
-        return self._max_value
-
-    @max_value.setter
-    def max_value(self, value: str) -> None:
-        self._max_value = value
-
-    @property
-    def min_value(self) -> str:
-        return self._min_value
-
-    @min_value.setter
-    def min_value(self, value: str) -> None:
-        self._min_value = value
-
-    def use_name_to_override_params(self) -> None:
-        """
-        Sets flag parameters to those mandated by the overrides.
-        In general, this function should always be called right
-        before finalizing the flag creation/changes to ensure
-        that certain values that should always be the same for
-        certain flag types are upheld.
-        """
-        super(StringArrayFlag, self).use_name_to_override_params()
-        OVERRIDES = overrides["STRING_ARRAY_OVERRIDES"]
-        for regex, value in OVERRIDES["OVERRIDE_STRING_ARRAY_INIT_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.init_value = value
-        for regex, value in OVERRIDES["OVERRIDE_STRING_ARRAY_MAX_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.max_value = value
-        for regex, value in OVERRIDES["OVERRIDE_STRING_ARRAY_MIN_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.min_value = value
+    def to_record(self) -> dict:
+        r = super(StringArrayFlag, self).to_record()
+        r["InitValue"] = [{"Values": list(self.init_value)}]
+        r["MaxValue"] = self.max_value
+        r["MinValue"] = self.min_value
+        return r
 
 
 class String64ArrayFlag(StringArrayFlag):
+    __slots__ = ()
+
     def __init__(self, flag: Hash = None, **kwargs) -> None:
         super(String64ArrayFlag, self).__init__(flag=flag)
 
@@ -1174,6 +855,8 @@ class String64ArrayFlag(StringArrayFlag):
 
 
 class String256ArrayFlag(StringArrayFlag):
+    __slots__ = ()
+
     def __init__(self, flag: Hash = None, **kwargs) -> None:
         super(String256ArrayFlag, self).__init__(flag=flag)
 
@@ -1193,6 +876,9 @@ class String256ArrayFlag(StringArrayFlag):
 
 
 class Vec2Flag(BFUFlag):
+    OVERRIDE_GROUP = "VEC2_OVERRIDES"
+    __slots__ = ("init_value", "max_value", "min_value")
+
     def __init__(self, flag: Hash = None, **kwargs) -> None:
         super(Vec2Flag, self).__init__(flag=flag)
         self.init_value = (0.0, 0.0)
@@ -1270,52 +956,18 @@ class Vec2Flag(BFUFlag):
         r["MinValue"] = array
         return r
 
-    @property
-    def init_value(self) -> Tuple[float, float]:
-        return self._init_value
-
-    @init_value.setter
-    def init_value(self, value: Tuple[float, float]) -> None:
-        self._init_value = value
-
-    @property
-    def max_value(self) -> Tuple[float, float]:
-        return self._max_value
-
-    @max_value.setter
-    def max_value(self, value: Tuple[float, float]) -> None:
-        self._max_value = value
-
-    @property
-    def min_value(self) -> Tuple[float, float]:
-        return self._min_value
-
-    @min_value.setter
-    def min_value(self, value: Tuple[float, float]) -> None:
-        self._min_value = value
-
-    def use_name_to_override_params(self) -> None:
-        """
-        Sets flag parameters to those mandated by the overrides.
-        In general, this function should always be called right
-        before finalizing the flag creation/changes to ensure
-        that certain values that should always be the same for
-        certain flag types are upheld.
-        """
-        super(Vec2Flag, self).use_name_to_override_params()
-        OVERRIDES = overrides["VEC2_OVERRIDES"]
-        for regex, value in OVERRIDES["OVERRIDE_VEC2_INIT_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.init_value = value
-        for regex, value in OVERRIDES["OVERRIDE_VEC2_MAX_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.max_value = value
-        for regex, value in OVERRIDES["OVERRIDE_VEC2_MIN_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.min_value = value
+    def to_record(self) -> dict:
+        r = super(Vec2Flag, self).to_record()
+        r["InitValue"] = [[float(self.init_value[0]), float(self.init_value[1])]]
+        r["MaxValue"] = [[float(self.max_value[0]), float(self.max_value[1])]]
+        r["MinValue"] = [[float(self.min_value[0]), float(self.min_value[1])]]
+        return r
 
 
 class Vec2ArrayFlag(BFUFlag):
+    OVERRIDE_GROUP = "VEC2_ARRAY_OVERRIDES"
+    __slots__ = ("init_value", "max_value", "min_value")
+
     def __init__(self, flag: Hash = None, **kwargs) -> None:
         super(Vec2ArrayFlag, self).__init__(flag=flag)
         self.init_value = [(0.0, 0.0)]
@@ -1405,52 +1057,20 @@ class Vec2ArrayFlag(BFUFlag):
         r["MinValue"] = vec_array
         return r
 
-    @property
-    def init_value(self) -> List[Tuple[float, float]]:
-        return self._init_value
-
-    @init_value.setter
-    def init_value(self, value: List[Tuple[float, float]]) -> None:
-        self._init_value = value
-
-    @property
-    def max_value(self) -> Tuple[float, float]:
-        return self._max_value
-
-    @max_value.setter
-    def max_value(self, value: Tuple[float, float]) -> None:
-        self._max_value = value
-
-    @property
-    def min_value(self) -> Tuple[float, float]:
-        return self._min_value
-
-    @min_value.setter
-    def min_value(self, value: Tuple[float, float]) -> None:
-        self._min_value = value
-
-    def use_name_to_override_params(self) -> None:
-        """
-        Sets flag parameters to those mandated by the overrides.
-        In general, this function should always be called right
-        before finalizing the flag creation/changes to ensure
-        that certain values that should always be the same for
-        certain flag types are upheld.
-        """
-        super(Vec2ArrayFlag, self).use_name_to_override_params()
-        OVERRIDES = overrides["VEC2_ARRAY_OVERRIDES"]
-        for regex, value in OVERRIDES["OVERRIDE_VEC2_ARRAY_INIT_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.init_value = value
-        for regex, value in OVERRIDES["OVERRIDE_VEC2_ARRAY_MAX_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.max_value = value
-        for regex, value in OVERRIDES["OVERRIDE_VEC2_ARRAY_MIN_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.min_value = value
+    def to_record(self) -> dict:
+        r = super(Vec2ArrayFlag, self).to_record()
+        r["InitValue"] = [
+            {"Values": [[[float(vector[0]), float(vector[1])]] for vector in self.init_value]}
+        ]
+        r["MaxValue"] = [[float(self.max_value[0]), float(self.max_value[1])]]
+        r["MinValue"] = [[float(self.min_value[0]), float(self.min_value[1])]]
+        return r
 
 
 class Vec3Flag(BFUFlag):
+    OVERRIDE_GROUP = "VEC3_OVERRIDES"
+    __slots__ = ("init_value", "max_value", "min_value")
+
     def __init__(self, flag: Hash = None, **kwargs) -> None:
         super(Vec3Flag, self).__init__(flag=flag)
         self.init_value = (0.0, 0.0, 0.0)
@@ -1546,52 +1166,18 @@ class Vec3Flag(BFUFlag):
         r["MinValue"] = vec_array
         return r
 
-    @property
-    def init_value(self) -> Tuple[float, float, float]:
-        return self._init_value
-
-    @init_value.setter
-    def init_value(self, value: Tuple[float, float, float]) -> None:
-        self._init_value = value
-
-    @property
-    def max_value(self) -> Tuple[float, float, float]:
-        return self._max_value
-
-    @max_value.setter
-    def max_value(self, value: Tuple[float, float, float]) -> None:
-        self._max_value = value
-
-    @property
-    def min_value(self) -> Tuple[float, float, float]:
-        return self._min_value
-
-    @min_value.setter
-    def min_value(self, value: Tuple[float, float, float]) -> None:
-        self._min_value = value
-
-    def use_name_to_override_params(self) -> None:
-        """
-        Sets flag parameters to those mandated by the overrides.
-        In general, this function should always be called right
-        before finalizing the flag creation/changes to ensure
-        that certain values that should always be the same for
-        certain flag types are upheld.
-        """
-        super(Vec3Flag, self).use_name_to_override_params()
-        OVERRIDES = overrides["VEC3_OVERRIDES"]
-        for regex, value in OVERRIDES["OVERRIDE_VEC3_INIT_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.init_value = value
-        for regex, value in OVERRIDES["OVERRIDE_VEC3_MAX_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.max_value = value
-        for regex, value in OVERRIDES["OVERRIDE_VEC3_MIN_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.min_value = value
+    def to_record(self) -> dict:
+        r = super(Vec3Flag, self).to_record()
+        r["InitValue"] = [[float(value) for value in self.init_value[:3]]]
+        r["MaxValue"] = [[float(value) for value in self.max_value[:3]]]
+        r["MinValue"] = [[float(value) for value in self.min_value[:3]]]
+        return r
 
 
 class Vec3ArrayFlag(BFUFlag):
+    OVERRIDE_GROUP = "VEC3_ARRAY_OVERRIDES"
+    __slots__ = ("init_value", "max_value", "min_value")
+
     def __init__(self, flag: Hash = None, **kwargs) -> None:
         super(Vec3ArrayFlag, self).__init__(flag=flag)
         self.init_value = [(0.0, 0.0, 0.0)]
@@ -1695,52 +1281,20 @@ class Vec3ArrayFlag(BFUFlag):
         r["MinValue"] = vec_array
         return r
 
-    @property
-    def init_value(self) -> List[Tuple[float, float, float]]:
-        return self._init_value
-
-    @init_value.setter
-    def init_value(self, value: List[Tuple[float, float, float]]) -> None:
-        self._init_value = value
-
-    @property
-    def max_value(self) -> Tuple[float, float, float]:
-        return self._max_value
-
-    @max_value.setter
-    def max_value(self, value: Tuple[float, float, float]) -> None:
-        self._max_value = value
-
-    @property
-    def min_value(self) -> Tuple[float, float, float]:
-        return self._min_value
-
-    @min_value.setter
-    def min_value(self, value: Tuple[float, float, float]) -> None:
-        self._min_value = value
-
-    def use_name_to_override_params(self) -> None:
-        """
-        Sets flag parameters to those mandated by the overrides.
-        In general, this function should always be called right
-        before finalizing the flag creation/changes to ensure
-        that certain values that should always be the same for
-        certain flag types are upheld.
-        """
-        super(Vec3ArrayFlag, self).use_name_to_override_params()
-        OVERRIDES = overrides["VEC3_ARRAY_OVERRIDES"]
-        for regex, value in OVERRIDES["OVERRIDE_VEC3_ARRAY_INIT_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.init_value = value
-        for regex, value in OVERRIDES["OVERRIDE_VEC3_ARRAY_MAX_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.max_value = value
-        for regex, value in OVERRIDES["OVERRIDE_VEC3_ARRAY_MIN_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.min_value = value
+    def to_record(self) -> dict:
+        r = super(Vec3ArrayFlag, self).to_record()
+        r["InitValue"] = [
+            {"Values": [[[float(value) for value in vector[:3]]] for vector in self.init_value]}
+        ]
+        r["MaxValue"] = [[float(value) for value in self.max_value[:3]]]
+        r["MinValue"] = [[float(value) for value in self.min_value[:3]]]
+        return r
 
 
 class Vec4Flag(BFUFlag):
+    OVERRIDE_GROUP = "VEC4_OVERRIDES"
+    __slots__ = ("init_value", "max_value", "min_value")
+
     def __init__(self, flag: Hash = None, **kwargs) -> None:
         super(Vec4Flag, self).__init__(flag=flag)
         self.init_value = (0.0, 0.0, 0.0, 0.0)
@@ -1774,7 +1328,7 @@ class Vec4Flag(BFUFlag):
         if not super(Vec4Flag, self).__eq__(super(Vec4Flag, other)):
             return False
         if (
-            not self.init_value == other._init_value
+            not self.init_value == other.init_value
             or not self.max_value == other.max_value
             or not self.min_value == other.min_value
         ):
@@ -1845,46 +1399,10 @@ class Vec4Flag(BFUFlag):
         r["MinValue"] = array
         return r
 
-    @property
-    def init_value(self) -> Tuple[float, float, float, float]:
-        return self._init_value
-
-    @init_value.setter
-    def init_value(self, value: Tuple[float, float, float, float]) -> None:
-        self._init_value = value
-
-    @property
-    def max_value(self) -> Tuple[float, float, float, float]:
-        return self._max_value
-
-    @max_value.setter
-    def max_value(self, value: Tuple[float, float, float, float]) -> None:
-        self._max_value = value
-
-    @property
-    def min_value(self) -> Tuple[float, float, float, float]:
-        return self._min_value
-
-    @min_value.setter
-    def min_value(self, value: Tuple[float, float, float, float]) -> None:
-        self._min_value = value
+    def to_record(self) -> dict:
+        r = super(Vec4Flag, self).to_record()
+        r["InitValue"] = [[float(value) for value in self.init_value[:4]]]
+        r["MaxValue"] = [[float(value) for value in self.max_value[:4]]]
+        r["MinValue"] = [[float(value) for value in self.min_value[:4]]]
+        return r
 
-    def use_name_to_override_params(self) -> None:
-        """
-        Sets flag parameters to those mandated by the overrides.
-        In general, this function should always be called right
-        before finalizing the flag creation/changes to ensure
-        that certain values that should always be the same for
-        certain flag types are upheld.
-        """
-        super(Vec4Flag, self).use_name_to_override_params()
-        OVERRIDES = overrides["VEC4_OVERRIDES"]
-        for regex, value in OVERRIDES["OVERRIDE_VEC4_INIT_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.init_value = value
-        for regex, value in OVERRIDES["OVERRIDE_VEC4_MAX_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.max_value = value
-        for regex, value in OVERRIDES["OVERRIDE_VEC4_MIN_VALUE"].items():
-            if re.search(regex, self.data_name):
-                self.min_value = value
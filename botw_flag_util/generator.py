@@ -1,63 +1,46 @@
-import ctypes
+import hashlib
 import json
 import time
 import zlib
-from math import ceil
+from functools import partial
+from itertools import chain
+from multiprocessing import Pool
 from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Union
 
 import oead
-from bcml.mergers import mubin
-from bcml import util as bcmlutil
-
-from . import (
-    EXEC_DIR,
-    BGDATA_MAPPING,
-    util,
-    vanilla_hash_dict,
-    vanilla_actors,
-    vanilla_shrine_locs,
-)
+
+from . import util, vanilla_actors, vanilla_shrine_locs
+from .__version__ import VERSION
 from .flag import BoolFlag, S32Flag
+from .hashing import get_flag_hash, get_flag_hashes
+from .override import refresh_overrides
+from .spatial import PointIndex
 from .store import FlagStore
 
 
-current_map: str = ""
-bgdata: FlagStore = FlagStore()
-mod_actors_with_life: set = set()
-added_flag_hashes: set = set()
-orphaned_flag_hashes: set = set()
 GENERATOR_FLAG_NAME_EXCEPTIONS: list = [
     "DgnMrgPrt",
 ]
 
 
-def should_make_flag(obj) -> bool:
-    if "!Parameters" in obj:
-        if "ForceFlag" in obj["!Parameters"]:
-            return obj["!Parameters"]["ForceFlag"]
-
-    if "LinkTag" in obj["UnitConfigName"]:
-        try:
-            makeflag = obj["!Parameters"]["MakeSaveFlag"].v
-        except KeyError:
-            return False
-        if makeflag == 0 and not "SaveFlag" in obj["!Parameters"]:
-            return False
-        return True
+def get_position(obj) -> tuple:
+    return (obj["Translate"][0].v, obj["Translate"][1].v, obj["Translate"][2].v)
 
-    for substr in GENERATOR_FLAG_NAME_EXCEPTIONS:
-        if substr in obj["UnitConfigName"]:
-            return False
 
-    if obj["UnitConfigName"] in mod_actors_with_life:
-        return True
+def makes_shrine_flag(obj) -> bool:
+    """Returns True for LinkTags whose flag is named after the nearest shrine"""
+    if not "LinkTag" in obj["UnitConfigName"] or not "!Parameters" in obj:
+        return False
+    return "MakeSaveFlag" in obj["!Parameters"] and obj["!Parameters"]["MakeSaveFlag"].v == 2
 
-    if obj["UnitConfigName"] in vanilla_actors["with_flags"]:
-        return True
-    return False
 
-
-def get_flag_name(obj, maptype: str) -> str:
+def get_flag_name(obj, maptype: str, dungeon: str, shrines: Dict[tuple, str]) -> str:
+    """
+    Returns the name of the flag for a map object. dungeon is the name of the
+    CDungeon the object is in, or empty in MainField. shrines holds the nearest
+    shrines of the map's LinkTags, looked up by FlagGenerator.get_nearest_shrines().
+    """
     if "LinkTag" in obj["UnitConfigName"] and "!Parameters" in obj:
         try:
             makeflag = obj["!Parameters"]["MakeSaveFlag"].v
@@ -67,312 +50,592 @@ def get_flag_name(obj, maptype: str) -> str:
             return obj["!Parameters"]["SaveFlag"]
             # should_make_flag() will stop cases where `not "SaveFlag" in obj["!Parameters"]`
         elif makeflag == 1:
-            if not current_map:
+            if not dungeon:
                 raise ValueError(
                     "A LinkTag was created with MakeSaveFlag 1 in MainField, this is not valid"
                 )
-            return f"Clear_{current_map}"
+            return f"Clear_{dungeon}"
         elif makeflag == 2:
-            if current_map:
+            if dungeon:
                 raise ValueError(
                     "A LinkTag was created with MakeSaveFlag 2 in CDungeon, this is not valid"
                 )
-            loc = oead.Vector3f()
-            loc.x = obj["Translate"][0].v
-            loc.y = obj["Translate"][1].v
-            loc.z = obj["Translate"][2].v
-            return f"Open_{util.get_nearest_shrine(loc)}"
+            return f"Open_{shrines[get_position(obj)]}"
     return f"{maptype}_{obj['UnitConfigName']}_{obj['HashId'].v}"
 
 
-def bool_flag(new_obj, old_obj, maptype: str, resettype: int = 1, revival: bool = True) -> None:
-    old_hash: int = ctypes.c_int32(zlib.crc32(get_flag_name(old_obj, maptype).encode())).value
-    new_name: str = get_flag_name(new_obj, maptype)
-
-    if not should_make_flag(new_obj):
-        bgdata.remove("bool_data", old_hash)
-        new_hash = ctypes.c_int32(zlib.crc32(new_name.encode())).value
-        bgdata.remove("bool_data", new_hash)
-        return
+class FlagGenerator:
+    """
+    Generates flags for the mod in moddir into a FlagStore. All the state of a
+    generation lives on the instance: the mod folder, the store, the mod's actors
+    with life and shrines, and the hashes of the flags added and orphaned so far,
+    so separate instances can generate flags for different mods in one process.
+
+    diff_map() only reads the actors with life and shrines, and returns the
+    operations that apply_flag_op() carries out, so maps can be diffed on any
+    thread or process. A generator without a store can only diff maps.
+    """
 
-    if "TBox" in new_obj["UnitConfigName"]:
-        if "EnableRevival" in new_obj["!Parameters"]:
-            resettype = int(new_obj["!Parameters"]["EnableRevival"])
+    moddir: Path
+    bgdata: Optional[FlagStore]
+    mod_actors_with_life: set
+    added_flag_hashes: set
+    orphaned_flag_hashes: set
+
+    def __init__(
+        self, moddir: Path, bgdata: FlagStore = None, actors_with_life: set = None
+    ) -> None:
+        self.moddir = moddir
+        self.bgdata = bgdata
+        self.mod_actors_with_life = set(actors_with_life) if actors_with_life else set()
+        self.added_flag_hashes = set()
+        self.orphaned_flag_hashes = set()
+        self._shrine_locs: Optional[dict] = None
+        self._shrine_index: Optional[PointIndex] = None
+
+    @property
+    def shrine_locs(self) -> dict:
+        if self._shrine_locs is None:
+            self._shrine_locs = util.get_shrine_locs(self.moddir)
+        return self._shrine_locs
+
+    @property
+    def shrine_index(self) -> PointIndex:
+        if self._shrine_index is None:
+            self._shrine_index = PointIndex(
+                {shrine: (loc.x, loc.y, loc.z) for shrine, loc in self.shrine_locs.items()}
+            )
+        return self._shrine_index
+
+    def get_nearest_shrines(self, objs: Iterable) -> Dict[tuple, str]:
+        """
+        Returns the nearest shrine to each of the LinkTags that are named after one,
+        by position, looked up in one batch
+        """
+        positions = list(dict.fromkeys(get_position(obj) for obj in objs if makes_shrine_flag(obj)))
+        if not positions:
+            return {}
+        return dict(zip(positions, self.shrine_index.nearest_many(positions)))
+
+    def add_actors_with_life(self, actorinfo: oead.byml.Hash) -> None:
+        """Adds the actors in ActorInfo that have life and aren't vanilla actors"""
+        for actor in actorinfo["Actors"]:
+            if (
+                not actor["name"] in vanilla_actors["with_flags"]
+                and not actor["name"] in vanilla_actors["no_flags"]
+                and "generalLife" in actor
+            ):
+                self.mod_actors_with_life.add(actor["name"])
 
-    flag = bgdata.find("bool_data", old_hash)
-    old_exists = flag.exists()
-    if not old_exists:
-        flag = bgdata.find("bool_data", ctypes.c_int32(zlib.crc32(new_name.encode())).value)
-        if not flag.exists():
-            flag = BoolFlag(revival=revival)
-            flag.is_save = True
-            flag.reset_type = resettype
-    flag.data_name = new_name
-    flag.use_name_to_override_params()
+    def should_make_flag(self, obj) -> bool:
+        if "!Parameters" in obj:
+            if "ForceFlag" in obj["!Parameters"]:
+                return obj["!Parameters"]["ForceFlag"]
 
-    if old_exists:
-        bgdata.remove("bool_data", old_hash)
-    bgdata.add("bool_data", flag)
+        if "LinkTag" in obj["UnitConfigName"]:
+            try:
+                makeflag = obj["!Parameters"]["MakeSaveFlag"].v
+            except KeyError:
+                return False
+            if makeflag == 0 and not "SaveFlag" in obj["!Parameters"]:
+                return False
+            return True
+
+        for substr in GENERATOR_FLAG_NAME_EXCEPTIONS:
+            if substr in obj["UnitConfigName"]:
+                return False
+
+        if obj["UnitConfigName"] in self.mod_actors_with_life:
+            return True
+
+        if obj["UnitConfigName"] in vanilla_actors["with_flags"]:
+            return True
+        return False
+
+    def flag_op(
+        self,
+        ftype: str,
+        new_obj,
+        old_obj,
+        maptype: str,
+        resettype: int,
+        revival: bool,
+        dungeon: str,
+        shrines: Dict[tuple, str],
+    ) -> tuple:
+        """Returns the operation that makes or removes the bool or s32 flag of an object"""
+        old_name: str = get_flag_name(old_obj, maptype, dungeon, shrines)
+        new_name: str = get_flag_name(new_obj, maptype, dungeon, shrines)
+
+        if not self.should_make_flag(new_obj):
+            return (ftype, old_name, new_name, False, resettype, revival)
+
+        if ftype == "bool_data" and "TBox" in new_obj["UnitConfigName"]:
+            if "EnableRevival" in new_obj["!Parameters"]:
+                resettype = int(new_obj["!Parameters"]["EnableRevival"])
+
+        return (ftype, old_name, new_name, True, resettype, revival)
+
+    def diff_map(
+        self,
+        map_data: oead.byml.Hash,
+        stock_map: oead.byml.Hash,
+        maptype: str,
+        resettype: int,
+        dungeon: str = "",
+    ) -> list:
+        """
+        Returns the flag operations that bring bgdata in line with a map, compared
+        to the stock map, without changing anything. Operations are either
+        ("orphan", hash) or (ftype, old_name, new_name, make_flag, resettype, revival)
+        """
+        ops: list = []
+        map_hashes = {obj["HashId"].v for obj in map_data["Objs"]}
+        stock_objs: dict = {}
+        for stock_obj in stock_map["Objs"]:
+            stock_objs.setdefault(stock_obj["HashId"].v, stock_obj)
+        shrines = (
+            {} if dungeon else self.get_nearest_shrines(chain(map_data["Objs"], stock_map["Objs"]))
+        )
+        for obj in map_data["Objs"]:
+            revival = True
+            bflag = True
+            if "LinkTag" in obj["UnitConfigName"]:
+                revival = False
+                if not "!Parameters" in obj:
+                    continue  # if it's a LinkTag with no !Parameters, fuck that developer
+                if "IncrementSave" in obj["!Parameters"]:
+                    if obj["!Parameters"]["IncrementSave"]:
+                        bflag = False
+            # objects that aren't in the stock map are compared against themselves
+            stock_obj = stock_objs.get(obj["HashId"].v, obj)
+            ftype = "bool_data" if bflag else "s32_data"
+            ops.append(
+                self.flag_op(ftype, obj, stock_obj, maptype, resettype, revival, dungeon, shrines)
+            )
+        orphan_names = [
+            f"{maptype}_{obj['UnitConfigName']}_{obj['HashId'].v}"
+            for obj in stock_map["Objs"]
+            if obj["HashId"].v not in map_hashes
+        ]
+        for old_hash in get_flag_hashes(orphan_names):
+            ops.append(("orphan", old_hash))
+        return ops
+
+    def apply_flag_op(self, op: tuple) -> None:
+        """Applies a single operation produced by diff_map() to bgdata"""
+        if op[0] == "orphan":
+            self.orphaned_flag_hashes.add(op[1])
+            return
+
+        ftype, old_name, new_name, make_flag, resettype, revival = op
+        old_hash: int = get_flag_hash(old_name)
+        new_hash: int = get_flag_hash(new_name)
+
+        if not make_flag:
+            self.bgdata.remove(ftype, old_hash)
+            self.bgdata.remove(ftype, new_hash)
+            return
+
+        flag = self.bgdata.find(ftype, old_hash)
+        old_exists = flag.exists()
+        if not old_exists:
+            flag = self.bgdata.find(ftype, new_hash)
+            if not flag.exists():
+                flag_class = BoolFlag if ftype == "bool_data" else S32Flag
+                flag = flag_class(revival=revival)
+                flag.is_save = True
+                flag.reset_type = resettype
+        flag.data_name = new_name
+        flag.use_name_to_override_params()
+
+        if old_exists:
+            self.bgdata.remove(ftype, old_hash)
+        self.bgdata.add(ftype, flag)
+
+        self.added_flag_hashes.add(flag.hash_value)
+
+    def generate_revival_flags_for_map(
+        self,
+        map_data: oead.byml.Hash,
+        stock_map: oead.byml.Hash,
+        maptype: str,
+        resettype: int,
+        dungeon: str = "",
+    ) -> None:
+        for op in self.diff_map(map_data, stock_map, maptype, resettype, dungeon):
+            self.apply_flag_op(op)
+
+    def actor_bool_flag(self, flag_name: str) -> int:
+        flag = BoolFlag()
+        flag.data_name = flag_name
+        flag.use_name_to_override_params()
+
+        self.bgdata.add("bool_data", flag)
+
+        return flag.hash_value
+
+    def actor_s32_flag(self, flag_name: str) -> int:
+        flag = S32Flag()
+        flag.data_name = flag_name
+        flag.use_name_to_override_params()
+
+        self.bgdata.add("s32_data", flag)
+
+        return flag.hash_value
+
+    def misc_bool_flag(self, name: str) -> None:
+        self.added_flag_hashes.add(self.actor_bool_flag(name))
+
+    def misc_s32_flag(self, name: str) -> None:
+        self.added_flag_hashes.add(self.actor_s32_flag(name))
+
+    def get_map_unit_ops(self, map_unit: Path, resettype: int) -> list:
+        map_start = time.time()
+        map_data = oead.byml.from_binary(oead.yaz0.decompress(map_unit.read_bytes()))
+        map_section = map_unit.stem.split("_")
+        stock_map = util.get_stock_map((map_section[0], map_section[1]))
+        ops = self.diff_map(map_data, stock_map, "MainField", resettype, dungeon="")
+        return [(map_unit.name, ops, time.time() - map_start)]
+
+    def get_dungeon_pack_ops(self, map_pack: Path, resettype: int) -> list:
+        results: list = []
+        pack_data = oead.Sarc(map_pack.read_bytes())
+        map_types = ("_Static", "_Dynamic")
+        stock_maps = util.get_stock_dungeon_maps(
+            map_pack, [f"{map_pack.stem}{map_type}" for map_type in map_types]
+        )
+        for map_type in map_types:
+            map_start = time.time()
+            map_name = f"{map_pack.stem}{map_type}.smubin"
+            map_data = oead.byml.from_binary(
+                oead.yaz0.decompress(
+                    pack_data.get_file(f"Map/CDungeon/{map_pack.stem}/{map_name}").data
+                )
+            )
+            if stock_maps:
+                stock_map = stock_maps[f"{map_pack.stem}{map_type}"]
+            else:
+                stock_map = oead.byml.Hash()
+                stock_map["Objs"] = oead.byml.Array()
+            ops = self.diff_map(map_data, stock_map, "CDungeon", resettype, map_pack.stem)
+            results.append((map_name, ops, time.time() - map_start))
+        return results
+
+    def get_manifest_context(self, resettypes: list) -> dict:
+        """Returns everything besides the unit itself that a unit's flag operations depend on"""
+        return {
+            "version": VERSION,
+            "game_version": util.get_game_version(),
+            "resettypes": list(resettypes),
+            "actors_with_life": sorted(self.mod_actors_with_life),
+            "shrines": sorted(
+                [name, [loc.x, loc.y, loc.z]] for name, loc in self.shrine_locs.items()
+            ),
+        }
+
+    def load_manifest(self, resettypes: list) -> dict:
+        manifest: dict = {
+            "context": self.get_manifest_context(resettypes),
+            "units": {},
+            "moddir": self.moddir,
+        }
+        manifest_path = get_manifest_path(self.moddir)
+        if manifest_path.exists():
+            try:
+                old_manifest = json.loads(manifest_path.read_text())
+            except json.JSONDecodeError:
+                return manifest
+            if old_manifest.get("context") == manifest["context"]:
+                manifest["old_units"] = old_manifest["units"]
+        return manifest
+
+    def apply_unit_results(self, unit_results: list) -> None:
+        for map_name, ops, map_time in unit_results:
+            for op in ops:
+                self.apply_flag_op(op)
+            if map_time is None:
+                print(f"Reused results for unchanged {map_name}...")
+            else:
+                print(f"Finished processing {map_name} in {map_time} seconds...")
+
+    def generate_revival_flags(
+        self, resettypes: list, jobs: int = 1, incremental: bool = False
+    ) -> None:
+        moddir = self.moddir
+        map_units = list(moddir.rglob("*_*.smubin")) if not resettypes[0] == -1 else []
+        map_packs = list(moddir.rglob("Pack/Dungeon*.pack")) if not resettypes[1] == -1 else []
+        manifest = self.load_manifest(resettypes) if incremental else None
+
+        pool = None
+        if jobs > 1 and len(map_units) + len(map_packs) > 1:
+            pool = Pool(
+                processes=jobs,
+                initializer=init_worker,
+                initargs=(moddir, self.mod_actors_with_life),
+            )
+        # results are consumed in submission order, so the store ends up identical to a serial run
+        imap = pool.imap if pool else map
+        # workers diff with their own generator, set up with the same actors by init_worker
+        unit_func = get_map_unit_ops if pool else self.get_map_unit_ops
+        pack_func = get_dungeon_pack_ops if pool else self.get_dungeon_pack_ops
+        try:
+            unit_results = get_unit_results(
+                map_units,
+                partial(unit_func, resettype=resettypes[0]),
+                imap,
+                manifest,
+                get_map_unit_stock_stamp,
+            )
+            pack_results = get_unit_results(
+                map_packs,
+                partial(pack_func, resettype=resettypes[1]),
+                imap,
+                manifest,
+                util.get_stock_dungeon_stamp,
+            )
+            for results in unit_results:
+                self.apply_unit_results(results)
+            if not resettypes[0] == -1:
+                for static_unit in moddir.rglob("MainField/Static.smubin"):
+                    map_start = time.time()
+                    static_data = oead.byml.from_binary(
+                        oead.yaz0.decompress(static_unit.read_bytes())
+                    )
+                    for marker in static_data["LocationMarker"]:
+                        if not "Icon" in marker:
+                            continue
+                        if not marker["Icon"] == "Dungeon":
+                            continue
+                        if "MessageID" in marker:
+                            if not marker["MessageID"] in vanilla_shrine_locs:
+                                self.misc_s32_flag(marker["SaveFlag"])
+                                self.misc_bool_flag(f"Enter_{marker['MessageID']}")
+                                self.misc_bool_flag(f"CompleteTreasure_{marker['MessageID']}")
+                    print(
+                        f"Finished processing MainField/Static.smubin in {time.time() - map_start} seconds..."
+                    )
+            for results in pack_results:
+                self.apply_unit_results(results)
+        except BaseException:
+            # don't wait for the queued units to be diffed only to be thrown away
+            if pool:
+                pool.terminate()
+            raise
+        else:
+            if pool:
+                pool.close()
+        finally:
+            if pool:
+                pool.join()
+        if manifest is not None:
+            save_manifest(manifest)
+        for hash in self.orphaned_flag_hashes:
+            if hash not in self.added_flag_hashes:
+                self.bgdata.remove("bool_data", hash)
+
+    def generate_item_flags(self) -> None:
+        moddir = self.moddir
+        mod_bool: set = set()
+        mod_s32: set = set()
+        for actor in moddir.rglob("*.sbactorpack"):
+            if "Animal_" in actor.name:
+                mod_bool.add(self.actor_bool_flag(f"IsNewPictureBook_{actor.stem}"))
+                mod_bool.add(self.actor_bool_flag(f"IsRegisteredPictureBook_{actor.stem}"))
+                mod_s32.add(self.actor_s32_flag(f"PictureBookSize_{actor.stem}"))
+                bxml = oead.aamp.ParameterIO.from_binary(
+                    oead.Sarc(oead.yaz0.decompress(actor.read_bytes()))
+                    .get_file(f"Actor/ActorLink/{actor.stem}.bxml")
+                    .data
+                )
+                if "Tags" in bxml.objects:
+                    for _, tag in bxml.objects["Tags"].params.items():
+                        if tag == "CanGetPouch":
+                            mod_bool.add(self.actor_bool_flag(f"IsGet_{actor.stem}"))
+                            break
+                del bxml
+            elif "Armor_" in actor.name:
+                mod_bool.add(self.actor_bool_flag(f"IsGet_{actor.stem}"))
+                mod_s32.add(self.actor_s32_flag(f"EquipTime_{actor.stem}"))
+                mod_s32.add(self.actor_s32_flag(f"PorchTime_{actor.stem}"))
+            elif "Enemy_" in actor.name:
+                mod_bool.add(self.actor_bool_flag(f"IsNewPictureBook_{actor.stem}"))
+                mod_bool.add(self.actor_bool_flag(f"IsRegisteredPictureBook_{actor.stem}"))
+                mod_s32.add(self.actor_s32_flag(f"PictureBookSize_{actor.stem}"))
+            elif "Item_" in actor.name:
+                mod_bool.add(self.actor_bool_flag(f"IsNewPictureBook_{actor.stem}"))
+                mod_bool.add(self.actor_bool_flag(f"IsRegisteredPictureBook_{actor.stem}"))
+                mod_bool.add(self.actor_bool_flag(f"IsGet_{actor.stem}"))
+                mod_s32.add(self.actor_s32_flag(f"PictureBookSize_{actor.stem}"))
+            elif "Npc_" in actor.name:
+                sarc = oead.Sarc(oead.yaz0.decompress(actor.read_bytes()))
+                bxml = oead.aamp.ParameterIO.from_binary(
+                    sarc.get_file(f"Actor/ActorLink/{actor.stem}.bxml").data
+                )
+                shop_link = bxml.objects["LinkTarget"].params["ShopDataUser"]
+                del bxml
+                if shop_link == "Dummy":
+                    del sarc
+                    continue
+                mod_bool.add(self.actor_bool_flag(f"{actor.stem}_SoldOut"))
+                bshop = oead.aamp.ParameterIO.from_binary(
+                    sarc.get_file(f"Actor/ShopData/{shop_link}.bshop").data
+                )
+                del sarc
+                for tablekey, tablename in bshop.objects["Header"].params.items():
+                    if tablekey.hash == zlib.crc32(b"TableNum"):
+                        continue
+                    for _, val in bshop.objects[str(tablename)].params.items():
+                        if isinstance(val.v, oead.FixedSafeString64):
+                            mod_s32.add(self.actor_s32_flag(f"{actor.stem}_{str(val.v)}"))
+                del bshop
+            elif "Weapon_" in actor.name:
+                mod_bool.add(self.actor_bool_flag(f"IsNewPictureBook_{actor.stem}"))
+                mod_bool.add(self.actor_bool_flag(f"IsRegisteredPictureBook_{actor.stem}"))
+                mod_bool.add(self.actor_bool_flag(f"IsGet_{actor.stem}"))
+                mod_s32.add(self.actor_s32_flag(f"PictureBookSize_{actor.stem}"))
+                mod_s32.add(self.actor_s32_flag(f"EquipTime_{actor.stem}"))
+                mod_s32.add(self.actor_s32_flag(f"PorchTime_{actor.stem}"))
 
-    added_flag_hashes.add(flag.hash_value)
+        """
+        This code section is meant to delete flags for actors that have been removed.
+        However, the likelihood of this ever actually needing to happen is so low,
+        and the cost of maintaining it so comparatively high, that it's being removed
+        for now. I might explore reimplementing it at a later date.
 
+        vanilla_hashes: set = set()
+        for _, hash_list in vanilla_hash_dict.items():
+            vanilla_hashes |= set(hash_list)
 
-def s32_flag(new_obj, old_obj, maptype: str, resettype: int = 1, revival: bool = True) -> None:
-    old_hash: int = ctypes.c_int32(zlib.crc32(get_flag_name(old_obj, maptype).encode())).value
-    new_name: str = get_flag_name(new_obj, maptype)
+        total_bool: set = set()
+        total_bool |= self.bgdata.find_all_hashes("bool_data", "IsNewPictureBook_")
+        total_bool |= self.bgdata.find_all_hashes("bool_data", "IsRegisteredPictureBook_")
+        total_bool |= self.bgdata.find_all_hashes("bool_data", "IsGet_")
+        to_delete = total_bool - (mod_bool | vanilla_hashes)
+        for hash in to_delete:
+            self.bgdata.remove("bool_data", hash)
 
-    if not should_make_flag(new_obj):
-        bgdata.remove("s32_data", old_hash)
-        new_hash = ctypes.c_int32(zlib.crc32(new_name.encode())).value
-        bgdata.remove("s32_data", new_hash)
-        return
+        total_s32: set = set()
+        total_s32 |= self.bgdata.find_all_hashes("s32_data", "PictureBookSize_")
+        total_s32 |= self.bgdata.find_all_hashes("s32_data", "EquipTime_")
+        total_s32 |= self.bgdata.find_all_hashes("s32_data", "PorchTime_")
+        to_delete = total_s32 - (mod_s32 | vanilla_hashes)
+        for hash in to_delete:
+            self.bgdata.remove("s32_data", hash)
+        """
 
-    flag = bgdata.find("s32_data", old_hash)
-    old_exists = flag.exists()
-    if not old_exists:
-        flag = bgdata.find("s32_data", ctypes.c_int32(zlib.crc32(new_name.encode())).value)
-        if not flag.exists():
-            flag = S32Flag(revival=revival)
-            flag.is_save = True
-            flag.reset_type = resettype
-    flag.data_name = new_name
-    flag.use_name_to_override_params()
 
-    if old_exists:
-        bgdata.remove("s32_data", old_hash)
-    bgdata.add("s32_data", flag)
+# the generator of a pool worker process, set up by init_worker. Every worker process
+# has its own, and it's never set in the process that runs the pool.
+_worker_generator: Optional[FlagGenerator] = None
 
-    added_flag_hashes.add(flag.hash_value)
 
+def init_worker(moddir: Path, actors_with_life: set) -> None:
+    """Sets up a pool worker with a store-less generator of its own for the mod's map units"""
+    global _worker_generator
+    _worker_generator = FlagGenerator(moddir, actors_with_life=actors_with_life)
 
-def misc_s32_flag(name: str) -> None:
-    flag = S32Flag()
-    flag.data_name = name
-    flag.use_name_to_override_params()
 
-    bgdata.add("s32_data", flag)
+def get_map_unit_ops(map_unit: Path, resettype: int) -> list:
+    """Diffs a map unit in a pool worker set up by init_worker"""
+    return _worker_generator.get_map_unit_ops(map_unit, resettype)  # type:ignore[union-attr]
 
-    added_flag_hashes.add(flag.hash_value)
 
+def get_dungeon_pack_ops(map_pack: Path, resettype: int) -> list:
+    """Diffs the maps of a dungeon pack in a pool worker set up by init_worker"""
+    return _worker_generator.get_dungeon_pack_ops(map_pack, resettype)  # type:ignore[union-attr]
 
-def misc_bool_flag(name: str) -> None:
-    flag = BoolFlag()
-    flag.data_name = name
-    flag.use_name_to_override_params()
 
-    bgdata.add("bool_data", flag)
+def get_file_hash(path: Path) -> str:
+    return hashlib.sha1(path.read_bytes()).hexdigest()
 
-    added_flag_hashes.add(flag.hash_value)
 
+def get_map_unit_stock_stamp(map_unit: Path) -> str:
+    map_section = map_unit.stem.split("_")
+    return util.get_stock_map_stamp((map_section[0], map_section[1]))
 
-def generate_revival_flags_for_map(
-    map_data: oead.byml.Hash, stock_map: oead.byml.Hash, maptype: str, resettype: int
-) -> None:
 
-    map_hashes = [obj["HashId"].v for obj in map_data["Objs"]]
-    stock_hashes = [obj["HashId"].v for obj in stock_map["Objs"]]
-    for obj in map_data["Objs"]:
-        revival = True
-        bflag = True
-        if "LinkTag" in obj["UnitConfigName"]:
-            revival = False
-            if not "!Parameters" in obj:
-                continue  # if it's a LinkTag with no !Parameters, fuck that developer
-            if "IncrementSave" in obj["!Parameters"]:
-                if obj["!Parameters"]["IncrementSave"]:
-                    bflag = False
-        if obj["HashId"].v not in stock_hashes:
-            if bflag:
-                bool_flag(obj, obj, maptype, resettype, revival)
-            else:
-                s32_flag(obj, obj, maptype, resettype, revival)
-        elif obj["HashId"].v in stock_hashes:
-            stock_obj = stock_map["Objs"][stock_hashes.index(obj["HashId"].v)]
-            if bflag:
-                bool_flag(obj, stock_obj, maptype, resettype, revival)
-            else:
-                s32_flag(obj, stock_obj, maptype, resettype, revival)
-    for obj in stock_map["Objs"]:
-        if obj["HashId"].v not in map_hashes:
-            old_hash: int = ctypes.c_int32(
-                zlib.crc32(f"{maptype}_{obj['UnitConfigName']}_{obj['HashId'].v}".encode())
-            ).value
-            orphaned_flag_hashes.add(old_hash)
+def get_manifest_path(moddir: Path) -> Path:
+    """
+    Returns where the manifest of a mod is kept. It lives in the cache folder rather
+    than the mod, so that it isn't packaged along with the mod by accident.
+    """
+    manifest_dir = util.get_cache_dir() / "manifests"
+    manifest_dir.mkdir(exist_ok=True)
+    return manifest_dir / f"{hashlib.sha1(str(moddir.resolve()).encode()).hexdigest()}.json"
 
 
-def generate_revival_flags(resettypes: list) -> None:
-    moddir: Path = util.root_dir()
+def save_manifest(manifest: dict) -> None:
+    manifest_path = get_manifest_path(manifest["moddir"])
+    manifest_path.write_text(
+        json.dumps({"context": manifest["context"], "units": manifest["units"]})
+    )
 
-    if not resettypes[0] == -1:
-        for map_unit in moddir.rglob("*_*.smubin"):
-            map_start = time.time()
-            map_data = oead.byml.from_binary(oead.yaz0.decompress(map_unit.read_bytes()))
-            map_section = map_unit.stem.split("_")
-            stock_map = mubin.get_stock_map((map_section[0], map_section[1]))
-            generate_revival_flags_for_map(map_data, stock_map, "MainField", resettypes[0])
-            print(f"Finished processing {map_unit.name} in {time.time() - map_start} seconds...")
-        for static_unit in moddir.rglob("MainField/Static.smubin"):
-            map_start = time.time()
-            static_data = oead.byml.from_binary(oead.yaz0.decompress(static_unit.read_bytes()))
-            for marker in static_data["LocationMarker"]:
-                if not "Icon" in marker:
-                    continue
-                if not marker["Icon"] == "Dungeon":
-                    continue
-                if "MessageID" in marker:
-                    if not marker["MessageID"] in vanilla_shrine_locs:
-                        misc_s32_flag(marker["SaveFlag"])
-                        misc_bool_flag(f"Enter_{marker['MessageID']}")
-                        misc_bool_flag(f"CompleteTreasure_{marker['MessageID']}")
-            print(
-                f"Finished processing MainField/Static.smubin in {time.time() - map_start} seconds..."
-            )
-    if not resettypes[1] == -1:
-        global current_map
-        for map_pack in moddir.rglob("Pack/Dungeon*.pack"):
-            current_map = map_pack.stem
-            pack_data = oead.Sarc(map_pack.read_bytes())
-            try:
-                stock_pack = oead.Sarc(bcmlutil.get_game_file(map_pack).read_bytes())
-            except FileNotFoundError:
-                stock_pack = None
-            map_types = ("_Static", "_Dynamic")
-            for map_type in map_types:
-                map_start = time.time()
-                map_name = f"{map_pack.stem}{map_type}.smubin"
-                map_data = oead.byml.from_binary(
-                    oead.yaz0.decompress(
-                        pack_data.get_file(f"Map/CDungeon/{map_pack.stem}/{map_name}").data
-                    )
-                )
-                if stock_pack:
-                    stock_map = oead.byml.from_binary(
-                        oead.yaz0.decompress(
-                            stock_pack.get_file(f"Map/CDungeon/{map_pack.stem}/{map_name}").data
-                        )
-                    )
-                else:
-                    stock_map = oead.byml.Hash()
-                    stock_map["Objs"] = oead.byml.Array()
-                generate_revival_flags_for_map(map_data, stock_map, "CDungeon", resettypes[1])
-                print(f"Finished processing {map_name} in {time.time() - map_start} seconds...")
-            current_map = ""
-            # ^ unnecessary given that it's updated every loop, but we rely on it possibly being
-            # empty for determining whether LinkTags are valid, so it's better to be safe
-    for hash in orphaned_flag_hashes:
-        if hash not in added_flag_hashes:
-            bgdata.remove("bool_data", hash)
-
-
-def actor_bool_flag(flag_name: str) -> int:
-    flag = BoolFlag()
-    flag.data_name = flag_name
-    flag.use_name_to_override_params()
-
-    bgdata.add("bool_data", flag)
-
-    return flag.hash_value
-
-
-def actor_s32_flag(flag_name: str) -> int:
-    flag = S32Flag()
-    flag.data_name = flag_name
-    flag.use_name_to_override_params()
-
-    bgdata.add("s32_data", flag)
-
-    return flag.hash_value
-
-
-def generate_item_flags() -> None:
-    moddir: Path = util.root_dir()
-    mod_bool: set = set()
-    mod_s32: set = set()
-    for actor in moddir.rglob("*.sbactorpack"):
-        if "Animal_" in actor.name:
-            mod_bool.add(actor_bool_flag(f"IsNewPictureBook_{actor.stem}"))
-            mod_bool.add(actor_bool_flag(f"IsRegisteredPictureBook_{actor.stem}"))
-            mod_s32.add(actor_s32_flag(f"PictureBookSize_{actor.stem}"))
-            bxml = oead.aamp.ParameterIO.from_binary(
-                oead.Sarc(oead.yaz0.decompress(actor.read_bytes()))
-                .get_file(f"Actor/ActorLink/{actor.stem}.bxml")
-                .data
-            )
-            if "Tags" in bxml.objects:
-                for _, tag in bxml.objects["Tags"].params.items():
-                    if tag == "CanGetPouch":
-                        mod_bool.add(actor_bool_flag(f"IsGet_{actor.stem}"))
-                        break
-            del bxml
-        elif "Armor_" in actor.name:
-            mod_bool.add(actor_bool_flag(f"IsGet_{actor.stem}"))
-            mod_s32.add(actor_s32_flag(f"EquipTime_{actor.stem}"))
-            mod_s32.add(actor_s32_flag(f"PorchTime_{actor.stem}"))
-        elif "Enemy_" in actor.name:
-            mod_bool.add(actor_bool_flag(f"IsNewPictureBook_{actor.stem}"))
-            mod_bool.add(actor_bool_flag(f"IsRegisteredPictureBook_{actor.stem}"))
-            mod_s32.add(actor_s32_flag(f"PictureBookSize_{actor.stem}"))
-        elif "Item_" in actor.name:
-            mod_bool.add(actor_bool_flag(f"IsNewPictureBook_{actor.stem}"))
-            mod_bool.add(actor_bool_flag(f"IsRegisteredPictureBook_{actor.stem}"))
-            mod_bool.add(actor_bool_flag(f"IsGet_{actor.stem}"))
-            mod_s32.add(actor_s32_flag(f"PictureBookSize_{actor.stem}"))
-        elif "Npc_" in actor.name:
-            sarc = oead.Sarc(oead.yaz0.decompress(actor.read_bytes()))
-            bxml = oead.aamp.ParameterIO.from_binary(
-                sarc.get_file(f"Actor/ActorLink/{actor.stem}.bxml").data
-            )
-            shop_link = bxml.objects["LinkTarget"].params["ShopDataUser"]
-            del bxml
-            if shop_link == "Dummy":
-                del sarc
-                continue
-            mod_bool.add(actor_bool_flag(f"{actor.stem}_SoldOut"))
-            bshop = oead.aamp.ParameterIO.from_binary(
-                sarc.get_file(f"Actor/ShopData/{shop_link}.bshop").data
-            )
-            del sarc
-            for tablekey, tablename in bshop.objects["Header"].params.items():
-                if tablekey.hash == zlib.crc32(b"TableNum"):
-                    continue
-                for _, val in bshop.objects[str(tablename)].params.items():
-                    if isinstance(val.v, oead.FixedSafeString64):
-                        mod_s32.add(actor_s32_flag(f"{actor.stem}_{str(val.v)}"))
-            del bshop
-        elif "Weapon_" in actor.name:
-            mod_bool.add(actor_bool_flag(f"IsNewPictureBook_{actor.stem}"))
-            mod_bool.add(actor_bool_flag(f"IsRegisteredPictureBook_{actor.stem}"))
-            mod_bool.add(actor_bool_flag(f"IsGet_{actor.stem}"))
-            mod_s32.add(actor_s32_flag(f"PictureBookSize_{actor.stem}"))
-            mod_s32.add(actor_s32_flag(f"EquipTime_{actor.stem}"))
-            mod_s32.add(actor_s32_flag(f"PorchTime_{actor.stem}"))
 
+def get_manifest_key(manifest: dict, unit: Path) -> str:
+    return unit.relative_to(manifest["moddir"]).as_posix()
+
+
+def get_cached_unit_results(manifest: dict, unit: Path, stock_stamp: str) -> Union[list, None]:
+    entry = manifest.get("old_units", {}).get(get_manifest_key(manifest, unit))
+    if not entry:
+        return None
+    # the recorded results are only valid against the same stock map
+    if not entry["stock_stamp"] == stock_stamp:
+        return None
+    stat = unit.stat()
+    if not entry["size"] == stat.st_size:
+        return None
+    if not entry["mtime"] == stat.st_mtime_ns:
+        if not entry["hash"] == get_file_hash(unit):
+            return None
+        entry["mtime"] = stat.st_mtime_ns
+    manifest["units"][get_manifest_key(manifest, unit)] = entry
+    return [(map_name, ops, None) for map_name, ops in entry["results"]]
+
+
+def record_unit_results(manifest: dict, unit: Path, results: list, stock_stamp: str) -> None:
+    stat = unit.stat()
+    manifest["units"][get_manifest_key(manifest, unit)] = {
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "hash": get_file_hash(unit),
+        "stock_stamp": stock_stamp,
+        "results": [[map_name, ops] for map_name, ops, _ in results],
+    }
+
+
+def get_unit_results(
+    units: list, func, imap, manifest: Union[dict, None], get_stock_stamp
+) -> Iterator[list]:
     """
-    This code section is meant to delete flags for actors that have been removed.
-    However, the likelihood of this ever actually needing to happen is so low,
-    and the cost of maintaining it so comparatively high, that it's being removed
-    for now. I might explore reimplementing it at a later date.
-
-    vanilla_hashes: set = set()
-    for _, hash_list in vanilla_hash_dict.items():
-        vanilla_hashes |= set(hash_list)
-
-    total_bool: set = set()
-    total_bool |= bgdata.find_all_hashes("bool_data", "IsNewPictureBook_")
-    total_bool |= bgdata.find_all_hashes("bool_data", "IsRegisteredPictureBook_")
-    total_bool |= bgdata.find_all_hashes("bool_data", "IsGet_")
-    to_delete = total_bool - (mod_bool | vanilla_hashes)
-    for hash in to_delete:
-        bgdata.remove("bool_data", hash)
-
-    total_s32: set = set()
-    total_s32 |= bgdata.find_all_hashes("s32_data", "PictureBookSize_")
-    total_s32 |= bgdata.find_all_hashes("s32_data", "EquipTime_")
-    total_s32 |= bgdata.find_all_hashes("s32_data", "PorchTime_")
-    to_delete = total_s32 - (mod_s32 | vanilla_hashes)
-    for hash in to_delete:
-        bgdata.remove("s32_data", hash)
+    Returns an iterator over the results of func for each unit, in order.
+    Units that are unchanged since they were recorded in the manifest, and whose
+    stock maps are unchanged as well, reuse their recorded results, and the rest
+    are processed with imap. get_stock_stamp returns the source stamp of the stock
+    maps of a unit.
     """
+    cached: dict = {}
+    stock_stamps: dict = {}
+    if manifest is not None:
+        for unit in units:
+            stock_stamps[unit] = get_stock_stamp(unit)
+            unit_results = get_cached_unit_results(manifest, unit, stock_stamps[unit])
+            if unit_results is not None:
+                cached[unit] = unit_results
+    fresh_results = imap(func, [unit for unit in units if unit not in cached])
+
+    def iterate_results() -> Iterator[list]:
+        for unit in units:
+            if unit in cached:
+                yield cached[unit]
+                continue
+            unit_results = next(fresh_results)
+            if manifest is not None:
+                record_unit_results(manifest, unit, unit_results, stock_stamps[unit])
+            yield unit_results
+
+    return iterate_results()
 
 
 def generate(args):
@@ -380,46 +643,46 @@ def generate(args):
         print("No flag options were chosen! Use -a and/or -r to generate flags.")
         exit()
 
-    util.root_dir(args.directory)
-    actorinfo_path = util.root_dir() / "content/Actor/ActorInfo.product.sbyml"
+    moddir = Path(args.directory)
+    refresh_overrides()
+    generator = FlagGenerator(moddir, FlagStore(columnar=True))
+    actorinfo_path = moddir / "content/Actor/ActorInfo.product.sbyml"
     if actorinfo_path.exists():
         actorinfo_bytes = actorinfo_path.read_bytes()
         actorinfo = oead.byml.from_binary(oead.yaz0.decompress(actorinfo_bytes))
-        for actor in actorinfo["Actors"]:
-            if (
-                not actor["name"] in vanilla_actors["with_flags"]
-                and not actor["name"] in vanilla_actors["no_flags"]
-                and "generalLife" in actor
-            ):
-                mod_actors_with_life.add(actor["name"])
+        generator.add_actors_with_life(actorinfo)
         del actorinfo_bytes
         del actorinfo
 
-    gamedata_sarc = util.get_gamedata_sarc()
-    for bgdata_name, bgdata_hash in map(util.unpack_oead_file, gamedata_sarc.get_files()):
-        bgdata.add_flags_from_Hash(bgdata_name, bgdata_hash)
-
-    if args.revival:
-        generate_revival_flags(args.revival)
-    if args.actor:
-        generate_item_flags()
-
-    files_to_write: list = []
-    files_to_write.append("GameData/gamedata.ssarc")
-    files_to_write.append("GameData/savedataformat.ssarc")
-    orig_files = util.get_last_two_savedata_files()
-    datas_to_write: list = []
-    bgdata_start = time.time()
-    datas_to_write.append(oead.yaz0.compress(util.make_new_gamedata(bgdata, args.bigendian)))
-    bgdata_time = time.time() - bgdata_start
-    print(f"Generating bgdata took {bgdata_time} seconds...")
-    bgdata_start = time.time()
-    datas_to_write.append(
-        oead.yaz0.compress(util.make_new_savedata(bgdata, args.bigendian, orig_files))
-    )
-    bgdata_time = time.time() - bgdata_start
-    print(f"Generating svdata took {bgdata_time} seconds...")
-    util.inject_files_into_bootup(files_to_write, datas_to_write)
+    bgdata = generator.bgdata
+    with util.BootupSession(
+        moddir / "content" / "Pack" / "Bootup.pack", compression_level=args.compression_level
+    ) as session:
+        session.add_gamedata_flags(bgdata, args.jobs)
+
+        if args.revival:
+            generator.generate_revival_flags(args.revival, args.jobs, args.incremental)
+        if args.actor:
+            generator.generate_item_flags()
+
+        orig_files = session.get_last_two_savedata_files()
+        bgdata_start = time.time()
+        session.set_file(
+            "GameData/gamedata.ssarc",
+            util.make_new_gamedata(bgdata, args.bigendian),
+            compress=True,
+        )
+        bgdata_time = time.time() - bgdata_start
+        print(f"Generating bgdata took {bgdata_time} seconds...")
+        bgdata_start = time.time()
+        session.set_file(
+            "GameData/savedataformat.ssarc",
+            util.make_new_savedata(bgdata, args.bigendian, orig_files),
+            compress=True,
+        )
+        bgdata_time = time.time() - bgdata_start
+        print(f"Generating svdata took {bgdata_time} seconds...")
+        session.save()
 
     if bgdata.get_total_changes() > 0:
         print()
@@ -431,7 +694,7 @@ def generate(args):
         print(f"{bgdata.get_num_deleted_svdata()} Deleted Save Data Entries")
 
         if args.verbose:
-            flag_path = util.root_dir() / "flag_log.txt"
+            flag_path = moddir / "flag_log.txt"
             flag_path.touch()
             flag_path.write_text(util.get_verbose_output(bgdata))
             flag_dir = str(flag_path).replace("\\", "/")
@@ -0,0 +1,22 @@
+from functools import lru_cache
+from typing import Iterable, List
+from zlib import crc32
+
+
+def to_s32(value: int) -> int:
+    """Reinterprets an unsigned 32-bit int as a signed one"""
+    return value - 0x100000000 if value & 0x80000000 else value
+
+
+@lru_cache(maxsize=65536)
+def get_flag_hash(name: str) -> int:
+    """Returns the HashValue of a flag name, the signed CRC32 of its UTF-8 bytes, memoized"""
+    return to_s32(crc32(name.encode("utf-8")))
+
+
+def get_flag_hashes(names: Iterable[str]) -> List[int]:
+    """
+    Returns the HashValues of many flag names at once, without going through
+    or filling the cache of get_flag_hash, for names that are only hashed once
+    """
+    return list(map(to_s32, map(crc32, map(str.encode, names))))
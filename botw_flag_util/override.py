@@ -0,0 +1,96 @@
+import json
+import re
+from functools import lru_cache
+from typing import Dict, List, Pattern, Tuple, Union
+
+from . import EXEC_DIR
+
+OVERRIDES_PATH = EXEC_DIR / "data/overrides.json"
+
+
+class OverrideMatcher:
+    """
+    Compiled form of the overrides in overrides.json for one flag type.
+    For each property, the patterns are kept in file order, and the value
+    of the last pattern that matches a flag name is the one that applies.
+    """
+
+    _properties: List[Tuple[str, Union[Pattern, None], List[Tuple[Pattern, object]]]]
+
+    def __init__(self, groups: List[str]) -> None:
+        self._properties = []
+        for group in groups:
+            # e.g. "OVERRIDE_BOOL_CATEGORY" in "BOOL_OVERRIDES" sets "category"
+            prefix = "OVERRIDE_" if group == "STANDARD_OVERRIDES" else f"OVERRIDE_{group[:-10]}_"
+            for key, patterns in get_overrides()[group].items():
+                if not patterns:
+                    continue
+                compiled = [(re.compile(regex), value) for regex, value in patterns.items()]
+                compiled.reverse()
+                try:
+                    any_match: Union[Pattern, None] = re.compile(
+                        "|".join(f"(?:{regex})" for regex in patterns)
+                    )
+                except re.error:
+                    any_match = None
+                self._properties.append((key[len(prefix) :].lower(), any_match, compiled))
+
+    def match(self, name: str) -> List[Tuple[str, object]]:
+        """Returns the (property, value) pairs that the overrides mandate for a flag name"""
+        r: List[Tuple[str, object]] = []
+        for prop, any_match, compiled in self._properties:
+            if any_match and not any_match.search(name):
+                continue
+            for regex, value in compiled:
+                if regex.search(name):
+                    r.append((prop, value))
+                    break
+        return r
+
+
+def get_overrides_stat() -> tuple:
+    stat = OVERRIDES_PATH.stat()
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+_overrides: dict = {}
+_overrides_stat: tuple = ()
+_matchers: Dict[type, OverrideMatcher] = {}
+
+
+def get_overrides() -> dict:
+    global _overrides_stat
+    if not _overrides:
+        _overrides_stat = get_overrides_stat()
+        _overrides.update(json.loads(OVERRIDES_PATH.read_text()))
+    return _overrides
+
+
+def get_override_matcher(flag_class: type) -> OverrideMatcher:
+    if flag_class not in _matchers:
+        groups = [
+            cls.__dict__["OVERRIDE_GROUP"]
+            for cls in reversed(flag_class.__mro__)
+            if "OVERRIDE_GROUP" in cls.__dict__
+        ]
+        _matchers[flag_class] = OverrideMatcher(groups)
+    return _matchers[flag_class]
+
+
+@lru_cache(maxsize=65536)
+def resolve_overrides(flag_class: type, name: str) -> Tuple[Tuple[str, object], ...]:
+    """Returns the (property, value) pairs that the overrides mandate for a flag, memoized"""
+    return tuple(get_override_matcher(flag_class).match(name))
+
+
+def refresh_overrides() -> None:
+    """
+    Reloads overrides.json and discards every compiled matcher
+    and memoized resolution if the file changed since it was loaded
+    """
+    if not _overrides or get_overrides_stat() == _overrides_stat:
+        return
+    _overrides.clear()
+    _matchers.clear()
+    resolve_overrides.cache_clear()
+    get_overrides()
@@ -0,0 +1,89 @@
+import re
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Pattern, Set
+
+try:
+    from re import _parser as sre_parse  # type:ignore[attr-defined]
+except ImportError:
+    import sre_parse  # type:ignore[no-redef]
+
+
+def get_trigrams(text: str) -> Set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def get_required_literal(pattern: Pattern) -> str:
+    """
+    Returns the longest run of plain characters that every match of a regex
+    must contain, or an empty string if there's none that can be relied on
+    """
+    if pattern.flags & re.IGNORECASE or not isinstance(pattern.pattern, str):
+        return ""
+    longest = ""
+    current: List[str] = []
+    for op, arg in sre_parse.parse(pattern.pattern, pattern.flags):
+        if op == sre_parse.LITERAL:
+            current.append(chr(arg))
+            continue
+        if len(current) > len(longest):
+            longest = "".join(current)
+        current = []
+    if len(current) > len(longest):
+        longest = "".join(current)
+    return longest
+
+
+class NameIndex:
+    """
+    Trigram index over flag names, keyed by hash, for substring, prefix and
+    regex searches that only check the names sharing the query's trigrams
+    """
+
+    _names: Dict[int, str]
+    _trigrams: Dict[str, array]
+
+    def __init__(self, names: Dict[int, str]) -> None:
+        self._names = names
+        self._trigrams = {}
+        for hash, name in names.items():
+            for trigram in get_trigrams(name):
+                if trigram not in self._trigrams:
+                    self._trigrams[trigram] = array("i")
+                self._trigrams[trigram].append(hash)
+        self._sorted = sorted((name, hash) for hash, name in names.items())
+        self._sorted_names = [name for name, _ in self._sorted]
+
+    def _get_candidates(self, literal: str) -> Iterable[int]:
+        trigrams = get_trigrams(literal)
+        if not trigrams:
+            return self._names
+        postings = sorted((self._trigrams.get(trigram, ()) for trigram in trigrams), key=len)
+        r = set(postings[0])
+        for posting in postings[1:]:
+            # once there are fewer candidates than postings, checking the names is cheaper
+            if len(r) < len(posting):
+                break
+            r.intersection_update(posting)
+        return r
+
+    def find(self, search: str) -> Set[int]:
+        """Returns the hashes of the names that contain the passed string"""
+        return {hash for hash in self._get_candidates(search) if search in self._names[hash]}
+
+    def find_prefix(self, prefix: str) -> Set[int]:
+        """Returns the hashes of the names that start with the passed string"""
+        r: Set[int] = set()
+        for i in range(bisect_left(self._sorted_names, prefix), len(self._sorted)):
+            if not self._sorted_names[i].startswith(prefix):
+                break
+            r.add(self._sorted[i][1])
+        return r
+
+    def find_regex(self, pattern: Pattern) -> Set[int]:
+        """Returns the hashes of the names that a regex matches somewhere in"""
+        return {
+            hash
+            for hash in self._get_candidates(get_required_literal(pattern))
+            if pattern.search(self._names[hash])
+        }
@@ -0,0 +1,90 @@
+from math import sqrt
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # type:ignore[assignment]
+
+Point = Tuple[float, float, float]
+# a point's index, its split axis, and the subtrees below and above it on that axis
+Node = Tuple[int, int, Optional[tuple], Optional[tuple]]
+
+
+class PointIndex:
+    """
+    k-d tree over named 3D points, for finding the point nearest to a position.
+
+    Results match a linear search over the points in dict order: ties go to the
+    point that came first, and a position with no point closer than max_distance
+    gets an empty name. Batches of positions are searched with NumPy if it's
+    installed, and one at a time through the tree otherwise.
+    """
+
+    _names: List[str]
+    _coords: List[Point]
+
+    def __init__(self, points: Dict[str, Point], max_distance: float = 10000000.0) -> None:
+        self.max_distance = max_distance
+        self._names = list(points)
+        self._coords = [tuple(point) for point in points.values()]  # type:ignore[misc]
+        self._root = self._build(list(range(len(self._coords))), 0)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _build(self, indices: List[int], depth: int) -> Optional[Node]:
+        if not indices:
+            return None
+        axis = depth % 3
+        indices.sort(key=lambda index: self._coords[index][axis])
+        mid = len(indices) // 2
+        return (
+            indices[mid],
+            axis,
+            self._build(indices[:mid], depth + 1),
+            self._build(indices[mid + 1 :], depth + 1),
+        )
+
+    def _search(self, node: Node, position: Point, best: list) -> None:
+        index, axis, below, above = node
+        x, y, z = position
+        px, py, pz = self._coords[index]
+        distance = sqrt((x - px) ** 2 + (y - py) ** 2 + (z - pz) ** 2)
+        if distance < best[0] or (distance == best[0] and index < best[1]):
+            best[0] = distance
+            best[1] = index
+        diff = position[axis] - self._coords[index][axis]
+        near, far = (below, above) if diff < 0 else (above, below)
+        if near is not None:
+            self._search(near, position, best)
+        # points on the far side are at least diff away, and one exactly as far may still win a tie
+        if far is not None and abs(diff) <= best[0]:
+            self._search(far, position, best)
+
+    def nearest(self, position: Point) -> str:
+        """Returns the name of the point nearest to a position"""
+        if self._root is None:
+            return ""
+        best = [self.max_distance, -1]
+        self._search(self._root, position, best)
+        return self._names[best[1]] if best[1] > -1 else ""
+
+    def nearest_many(self, positions: Sequence[Point]) -> List[str]:
+        """Returns the name of the point nearest to each of the positions"""
+        if numpy is None or self._root is None or not positions:
+            return [self.nearest(position) for position in positions]
+        coords = numpy.array(self._coords, dtype=numpy.float64)
+        queries = numpy.array(positions, dtype=numpy.float64)
+        # summed in the same order as the tree search, so ties and the cutoff resolve the same
+        distances = numpy.sqrt(
+            (queries[:, 0:1] - coords[:, 0]) ** 2
+            + (queries[:, 1:2] - coords[:, 1]) ** 2
+            + (queries[:, 2:3] - coords[:, 2]) ** 2
+        )
+        nearest = distances.argmin(axis=1)
+        found = distances[numpy.arange(len(queries)), nearest] < self.max_distance
+        return [
+            self._names[index] if is_found else ""
+            for index, is_found in zip(nearest.tolist(), found.tolist())
+        ]
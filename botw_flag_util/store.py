@@ -1,7 +1,10 @@
-from oead.byml import Array, Hash
-from typing import Dict, List, Set
+import re
+from oead.byml import Array, Hash, from_binary
+from typing import Callable, Dict, Iterable, List, MutableMapping, Pattern, Set, Union
 
-from . import BGDATA_MAPPING
+from . import BGDATA_MAPPING, byml
+from .columns import FlagColumns, SCALAR_TYPECODES
+from .search import NameIndex
 from .flag import (
     BFUFlag,
     BoolFlag,
@@ -97,66 +100,279 @@ IGNORED_SAVE_FLAGS = [
     "CameraUpDownReverse",
     "PlayReport_CtrlMode_Handheld",
 ]
+# building a NameIndex costs about as much as this many plain scans of the names,
+# see benchmarks/bench_name_search.py
+INDEX_MIN_SEARCHES = 100
 
 
 class FlagStore:
-    _store: Dict[str, Dict[int, BFUFlag]]
-    _orig_store: Dict[str, Dict[int, BFUFlag]]
+    """
+    Flags loaded from the game data are shared between _store and
+    _orig_store until they are handed out by find or find_all, at which
+    point _store gets its own copy, so the baseline is never modified
 
-    def __init__(self) -> None:
+    With columnar=True, each flag type is kept in a FlagColumns instead of a dict,
+    and flag objects are only built for the flags that are handed out or added
+
+    The hashes of flags that were handed out, added or removed are kept in
+    _dirty, so that finding the changes only has to look at those flags
+    """
+
+    _store: Dict[str, MutableMapping[int, BFUFlag]]
+    _orig_store: Dict[str, MutableMapping[int, BFUFlag]]
+    _dirty: Dict[str, Set[int]]
+    _name_indexes: Dict[str, NameIndex]
+    _positions: Dict[str, Dict[int, int]]
+    _queued_searches: Dict[str, int]
+
+    def __init__(self, columnar: bool = False) -> None:
+        self.columnar = columnar
         self._store = {}
         self._orig_store = {}
-        for ftype in FLAG_MAPPING:
-            self._store[ftype] = {}
-            self._orig_store[ftype] = {}
+        self._dirty = {}
+        self._name_indexes = {}
+        self._positions = {}
+        self._queued_searches = {}
+        for ftype, flag_class in FLAG_MAPPING.items():
+            self._dirty[ftype] = set()
+            if columnar:
+                self._orig_store[ftype] = FlagColumns(flag_class)
+                self._store[ftype] = FlagColumns(flag_class, base=self._orig_store[ftype])
+            else:
+                self._store[ftype] = {}
+                self._orig_store[ftype] = {}
+
+    def _columns(self, ftype: str, orig: bool = False) -> FlagColumns:
+        return (self._orig_store if orig else self._store)[ftype]  # type:ignore[return-value]
+
+    def _load_columns(
+        self, name: str, items: Iterable, overwrite: bool, records: bool = False
+    ) -> None:
+        """Loads the flags of each flag type in items, which are oead Arrays unless records"""
+        self._name_indexes.clear()
+        self._positions.clear()
+        is_revival = bool("revival" in name)
+        for ftype, flags in items:
+            orig = self._columns(ftype, orig=True)
+            start = orig.row_count
+            load = orig.load_records if records else orig.load
+            mismatched = load(flags, is_revival, skip=() if overwrite else self._store[ftype])
+            self._columns(ftype).add_base_rows(orig, start)
+            self._dirty[ftype].update(mismatched)
+
+    def add_flags_from_bgdata(self, name: str, data: bytes) -> None:
+        """
+        Loads the flags of a bgdata file like add_flags_from_Hash. Columnar stores read
+        bool, s32 and f32 flags straight from the binary, without building an oead Hash.
+        """
+        if self.columnar:
+            arrays = list(byml.BymlReader(data).iter_root_arrays())
+            if all(FLAG_MAPPING[ftype] in SCALAR_TYPECODES for ftype, _ in arrays):
+                self._load_columns(name, arrays, True, records=True)
+                return
+        self.add_flags_from_Hash(name, from_binary(data))
 
     def add_flags_from_Hash(self, name: str, data: Hash) -> None:
+        if self.columnar:
+            self._load_columns(name, data.items(), True)
+            return
+        self._name_indexes.clear()
+        self._positions.clear()
         is_revival = bool("revival" in name)
         for ftype, flags in data.items():
             for flag in flags:
-                self._store[ftype][flag["HashValue"].v] = FLAG_MAPPING[ftype](
-                    flag, revival=is_revival
-                )
-                self._orig_store[ftype][flag["HashValue"].v] = FLAG_MAPPING[ftype](
-                    flag, revival=is_revival
-                )
+                new_flag = FLAG_MAPPING[ftype](flag, revival=is_revival)
+                self._store[ftype][flag["HashValue"].v] = new_flag
+                self._orig_store[ftype][flag["HashValue"].v] = new_flag
+                if not new_flag.hash_value == flag["HashValue"].v:
+                    self._dirty[ftype].add(flag["HashValue"].v)
 
     def add_flags_from_Hash_no_overwrite(self, name: str, data: Hash) -> None:
+        if self.columnar:
+            self._load_columns(name, data.items(), False)
+            return
+        self._name_indexes.clear()
+        self._positions.clear()
         is_revival = bool("revival" in name)
         for ftype, flags in data.items():
             for flag in flags:
-                if not self.find(ftype, flag["HashValue"].v).exists():
-                    self._store[ftype][flag["HashValue"].v] = FLAG_MAPPING[ftype](
-                        flag, revival=is_revival
-                    )
-                    self._orig_store[ftype][flag["HashValue"].v] = FLAG_MAPPING[ftype](
-                        flag, revival=is_revival
-                    )
+                existing = self._store[ftype].get(flag["HashValue"].v)
+                if existing is None or not existing.exists():
+                    new_flag = FLAG_MAPPING[ftype](flag, revival=is_revival)
+                    self._store[ftype][flag["HashValue"].v] = new_flag
+                    self._orig_store[ftype][flag["HashValue"].v] = new_flag
+                    if not new_flag.hash_value == flag["HashValue"].v:
+                        self._dirty[ftype].add(flag["HashValue"].v)
+
+    def get_snapshot(self) -> dict:
+        """Returns the loaded flags in a picklable form, to be restored by load_snapshot"""
+        return {"columnar": self.columnar, "orig_store": self._orig_store, "dirty": self._dirty}
+
+    def load_snapshot(self, snapshot: dict) -> None:
+        """
+        Replaces the contents of the store with a snapshot taken right after loading,
+        before any flags were handed out, added or removed
+        """
+        if not snapshot["columnar"] == self.columnar:
+            raise ValueError("The snapshot is of a different kind of store.")
+        self._name_indexes.clear()
+        self._positions.clear()
+        for ftype, orig in snapshot["orig_store"].items():
+            self._orig_store[ftype] = orig
+            self._dirty[ftype] = set(snapshot["dirty"][ftype])
+            if self.columnar:
+                self._store[ftype] = FlagColumns(FLAG_MAPPING[ftype], base=orig)
+                self._columns(ftype).add_base_rows(orig, 0)
+            else:
+                self._store[ftype] = dict(orig)
+
+    def add_flags_from_snapshot(self, snapshot: dict) -> None:
+        """
+        Adds the flags from a snapshot of another freshly loaded store, as if its
+        data had been loaded into this store with add_flags_from_Hash
+        """
+        if not snapshot["columnar"] == self.columnar:
+            raise ValueError("The snapshot is of a different kind of store.")
+        self._name_indexes.clear()
+        self._positions.clear()
+        for ftype, orig in snapshot["orig_store"].items():
+            self._dirty[ftype].update(snapshot["dirty"][ftype])
+            if self.columnar:
+                start = self._columns(ftype, orig=True).row_count
+                self._columns(ftype, orig=True).extend(orig)
+                self._columns(ftype).add_base_rows(self._columns(ftype, orig=True), start)
+            else:
+                self._store[ftype].update(orig)
+                self._orig_store[ftype].update(orig)
+
+    def _get_mutable(self, ftype: str, hash: int) -> BFUFlag:
+        self._dirty[ftype].add(hash)
+        flag = self._store[ftype][hash]
+        if self.columnar:
+            return flag
+        if flag is self._orig_store[ftype].get(hash):
+            flag = flag.copy()
+            self._store[ftype][hash] = flag
+        return flag
 
     def find(self, ftype: str, hash: int) -> BFUFlag:
         if hash in self._store[ftype]:
-            return self._store[ftype][hash]
+            return self._get_mutable(ftype, hash)
         return BFUFlag()
 
+    def _get_name_index(self, ftype: str) -> NameIndex:
+        if ftype not in self._name_indexes:
+            if self.columnar:
+                names = self._columns(ftype, orig=True).get_names()
+            else:
+                names = {hash: flag.data_name for hash, flag in self._orig_store[ftype].items()}
+            self._name_indexes[ftype] = NameIndex(names)
+        return self._name_indexes[ftype]
+
+    def _get_positions(self, ftype: str) -> Dict[int, int]:
+        if ftype not in self._positions:
+            self._positions[ftype] = {hash: i for i, hash in enumerate(self._store[ftype])}
+        return self._positions[ftype]
+
+    def queue_searches(self, count: int) -> None:
+        """
+        Tells the store how many searches of each flag type are about to be made,
+        so that it only builds name indexes when there are enough to pay them off
+        """
+        for ftype in FLAG_MAPPING:
+            self._queued_searches[ftype] = count
+
+    def _use_name_index(self, ftype: str) -> bool:
+        """Counts a search of a flag type, and returns whether to search it with a NameIndex"""
+        queued = self._queued_searches.get(ftype, 0)
+        if queued:
+            self._queued_searches[ftype] = queued - 1
+        return ftype in self._name_indexes or queued >= INDEX_MIN_SEARCHES
+
+    def _search_hashes(
+        self,
+        ftype: str,
+        test: Callable[[str], bool],
+        lookup: Callable[[NameIndex], Set[int]],
+        scan: Callable[[], List[int]] = None,
+    ) -> List[int]:
+        """
+        Returns the hashes of the flags whose names pass the test, in store order.
+        Searches are plain scans, done by scan if passed, unless at least
+        INDEX_MIN_SEARCHES of the flag type were queued, in which case the
+        unchanged flags are looked up in a NameIndex of the loaded names instead.
+        """
+        if not self._use_name_index(ftype):
+            if scan is not None:
+                return scan()
+            if self.columnar:
+                names = self._columns(ftype).get_names().items()
+            else:
+                names = ((hash, flag.data_name) for hash, flag in self._store[ftype].items())
+            return [hash for hash, name in names if test(name)]
+        dirty = self._dirty[ftype]
+        r = {hash for hash in lookup(self._get_name_index(ftype)) if hash not in dirty}
+        r.update(
+            hash
+            for hash in dirty
+            if hash in self._store[ftype] and test(self._store[ftype][hash].data_name)
+        )
+        return sorted(r, key=self._get_positions(ftype).__getitem__)
+
     def find_all(self, ftype: str, search: str) -> List[BFUFlag]:
-        r: List[BFUFlag] = []
-        for _, flag in self._store[ftype].items():
-            if flag.name_contains(search):
-                r.append(flag)
-        return r
+        return [self._get_mutable(ftype, hash) for hash in self._find_hashes(ftype, search)]
 
     def find_all_hashes(self, ftype: str, search: str) -> Set[int]:
-        r: Set[int] = set()
-        for hash, flag in self._store[ftype].items():
-            if flag.name_contains(search):
-                r.add(hash)
-        return r
+        return set(self._find_hashes(ftype, search))
+
+    def _find_hashes(self, ftype: str, search: str) -> List[int]:
+        return self._search_hashes(
+            ftype,
+            lambda name: search in name,
+            lambda i: i.find(search),
+            (lambda: self._columns(ftype).find_hashes(search)) if self.columnar else None,
+        )
+
+    def find_all_prefix(self, ftype: str, prefix: str) -> List[BFUFlag]:
+        return [
+            self._get_mutable(ftype, hash)
+            for hash in self._search_hashes(
+                ftype, lambda name: name.startswith(prefix), lambda i: i.find_prefix(prefix)
+            )
+        ]
+
+    def find_all_regex(self, ftype: str, pattern: Union[str, Pattern]) -> List[BFUFlag]:
+        regex = re.compile(pattern)
+        return [
+            self._get_mutable(ftype, hash)
+            for hash in self._search_hashes(
+                ftype, lambda name: bool(regex.search(name)), lambda i: i.find_regex(regex)
+            )
+        ]
 
     def add(self, ftype: str, flag: BFUFlag) -> None:
+        if flag.hash_value not in self._store[ftype]:
+            self._positions.pop(ftype, None)
+        self._dirty[ftype].add(flag.hash_value)
         self._store[ftype][flag.hash_value] = flag
 
     def remove(self, ftype: str, hash: int) -> None:
-        self._store[ftype].pop(hash, None)
+        if hash in self._store[ftype]:
+            self._positions.pop(ftype, None)
+            self._dirty[ftype].add(hash)
+            del self._store[ftype][hash]
+
+    def _get_dirty_flags(self, ftype: str) -> List[BFUFlag]:
+        return [
+            self._store[ftype][hash] for hash in self._dirty[ftype] if hash in self._store[ftype]
+        ]
+
+    def _get_dirty_orig_flags(self, ftype: str) -> List[BFUFlag]:
+        return [
+            self._orig_store[ftype][hash]
+            for hash in self._dirty[ftype]
+            if hash in self._orig_store[ftype]
+        ]
 
     def get_num_new(self) -> int:
         r = 0
@@ -178,22 +394,23 @@ class FlagStore:
 
     def get_new_ftype(self, ftype: str) -> Set[str]:
         r: Set[str] = set()
-        for _, flag in self._store[ftype].items():
+        for flag in self._get_dirty_flags(ftype):
             if flag.hash_value not in self._orig_store[ftype]:
                 r.add(flag.data_name)
         return r
 
     def get_modified_ftype(self, ftype: str) -> Set[str]:
         r: Set[str] = set()
-        for _, flag in self._store[ftype].items():
+        for flag in self._get_dirty_flags(ftype):
             if flag.hash_value in self._orig_store[ftype]:
-                if not flag == self._orig_store[ftype][flag.hash_value]:
+                orig_flag = self._orig_store[ftype][flag.hash_value]
+                if not flag is orig_flag and not flag == orig_flag:
                     r.add(flag.data_name)
         return r
 
     def get_deleted_ftype(self, ftype: str) -> Set[str]:
         r: Set[str] = set()
-        for _, flag in self._orig_store[ftype].items():
+        for flag in self._get_dirty_orig_flags(ftype):
             if flag.hash_value not in self._store[ftype]:
                 r.add(flag.data_name)
         return r
@@ -220,7 +437,7 @@ class FlagStore:
 
     def get_new_ftype_svdata(self, ftype: str) -> Set[str]:
         r: Set[str] = set()
-        for _, flag in self._store[ftype].items():
+        for flag in self._get_dirty_flags(ftype):
             if flag.is_save:
                 if flag.hash_value not in self._orig_store[ftype]:
                     r.add(flag.data_name)
@@ -233,33 +450,47 @@ class FlagStore:
 
     def get_deleted_ftype_svdata(self, ftype: str) -> Set[str]:
         r: Set[str] = set()
-        for _, flag in self._orig_store[ftype].items():
+        for flag in self._get_dirty_orig_flags(ftype):
             if flag.is_save:
                 if flag.hash_value not in self._store[ftype]:
                     r.add(flag.data_name)
         return r
 
-    def flags_to_bgdata_Array(self, prefix: str) -> Array:
+    def get_bgdata_flags(self, prefix: str) -> List[BFUFlag]:
+        """Returns the flags that go in the bgdata files with the given prefix, sorted by hash"""
         ftype = BGDATA_MAPPING[prefix]
-        if prefix == "revival_bool_data" or prefix == "revival_s32_data":
-            flag_list = [
-                flag.to_Hash() for _, flag in self._store[ftype].items() if flag.is_revival
-            ]
+        if self.columnar:
+            if prefix == "revival_bool_data" or prefix == "revival_s32_data":
+                flag_list = self._columns(ftype).get_flags(revival=True)
+            elif prefix == "bool_data" or prefix == "s32_data":
+                flag_list = self._columns(ftype).get_flags(revival=False)
+            else:
+                flag_list = self._columns(ftype).get_flags()
+        elif prefix == "revival_bool_data" or prefix == "revival_s32_data":
+            flag_list = [flag for _, flag in self._store[ftype].items() if flag.is_revival]
         elif prefix == "bool_data" or prefix == "s32_data":
-            flag_list = [
-                flag.to_Hash() for _, flag in self._store[ftype].items() if not flag.is_revival
-            ]
+            flag_list = [flag for _, flag in self._store[ftype].items() if not flag.is_revival]
         else:
-            flag_list = [flag.to_Hash() for _, flag in self._store[ftype].items()]
+            flag_list = list(self._store[ftype].values())
 
-        return Array(sorted(flag_list, key=lambda f: f["HashValue"]))
+        return sorted(flag_list, key=lambda f: f.hash_value)
 
-    def flags_to_svdata_Array(self) -> Array:
-        flag_list: list = []
-        for _, flagdict in self._store.items():
+    def get_svdata_flags(self) -> List[BFUFlag]:
+        """Returns the flags that belong in the savedata files, sorted by hash"""
+        flag_list: List[BFUFlag] = []
+        for ftype, flagdict in self._store.items():
+            if self.columnar:
+                flag_list += self._columns(ftype).get_sv_flags(IGNORED_SAVE_FLAGS)
+                continue
             flag_list += [
-                flag.to_sv_Hash()
+                flag
                 for _, flag in flagdict.items()
                 if flag.is_save and not flag.data_name in IGNORED_SAVE_FLAGS
             ]
-        return Array(sorted(flag_list, key=lambda f: f["HashValue"]))
+        return sorted(flag_list, key=lambda f: f.hash_value)
+
+    def flags_to_bgdata_Array(self, prefix: str) -> Array:
+        return Array([flag.to_Hash() for flag in self.get_bgdata_flags(prefix)])
+
+    def flags_to_svdata_Array(self) -> Array:
+        return Array([flag.to_sv_Hash() for flag in self.get_svdata_flags()])
@@ -1,11 +1,18 @@
+import hashlib
+import os
+import pickle
+from concurrent.futures import Future, ThreadPoolExecutor
 from math import ceil, sqrt
+from multiprocessing import Pool
 from pathlib import Path
 from typing import Union
 from time import time
 
 import oead
 from bcml import util as bcmlutil
-from . import BGDATA_MAPPING, vanilla_shrine_locs
+from bcml.mergers import mubin
+from . import BGDATA_MAPPING, byml
+from .__version__ import VERSION
 from .store import FlagStore
 
 
@@ -54,64 +61,378 @@ def get_vector_distance(vec1: oead.Vector3f, vec2: oead.Vector3f) -> float:
     return sqrt((vec1.x - vec2.x) ** 2 + (vec1.y - vec2.y) ** 2 + (vec1.z - vec2.z) ** 2)
 
 
-def get_shrine_locs() -> dict:
-    if not hasattr(get_shrine_locs, "_shrine_locs"):
-        shrine_locs = {
-            shrine: convert_to_vec3f(loc) for shrine, loc in vanilla_shrine_locs.items()
-        }
-        static_path = root_dir() / "aoc/0010/Map/MainField/Static.smubin"
-        if static_path.exists():
-            static = oead.byml.from_binary(oead.yaz0.decompress(static_path.read_bytes()))
-            for marker in static["LocationMarker"]:
-                if not "Icon" in marker:
-                    continue
-                if not marker["Icon"] == "Dungeon":
-                    continue
-                if "MessageID" in marker:
-                    if not marker["MessageID"] in vanilla_shrine_locs:
-                        shrine_locs[marker["MessageID"]] = convert_to_vec3f(marker["Translate"])
-        get_shrine_locs._shrine_locs = shrine_locs  # type:ignore[attr-defined]
-    return get_shrine_locs._shrine_locs  # type:ignore[attr-defined]
-
-
-def get_nearest_shrine(vec: oead.Vector3f) -> str:
-    shrine_locs = get_shrine_locs()
-    smallest_distance: float = 10000000.0
-    nearest_shrine: str = ""
-    for name, loc in shrine_locs.items():
-        shrine_distance = get_vector_distance(vec, loc)
-        if shrine_distance < smallest_distance:
-            nearest_shrine = name
-            smallest_distance = shrine_distance
-    return nearest_shrine
-
-
-def get_gamedata_sarc() -> oead.Sarc:
-    bootup_path: Path = root_dir() / "content" / "Pack" / "Bootup.pack"
-    bootup_sarc = oead.Sarc(bootup_path.read_bytes())
-    gamedata_sarc = oead.Sarc(
-        oead.yaz0.decompress(bootup_sarc.get_file("GameData/gamedata.ssarc").data)
-    )
-    return gamedata_sarc
+def get_shrine_locs(moddir: Path) -> dict:
+    """Returns the locations of the vanilla shrines and of the shrines a mod adds to its DLC map"""
+    from . import vanilla_shrine_locs
+
+    shrine_locs = {shrine: convert_to_vec3f(loc) for shrine, loc in vanilla_shrine_locs.items()}
+    static_path = moddir / "aoc/0010/Map/MainField/Static.smubin"
+    if static_path.exists():
+        static = oead.byml.from_binary(oead.yaz0.decompress(static_path.read_bytes()))
+        for marker in static["LocationMarker"]:
+            if not "Icon" in marker:
+                continue
+            if not marker["Icon"] == "Dungeon":
+                continue
+            if "MessageID" in marker:
+                if not marker["MessageID"] in vanilla_shrine_locs:
+                    shrine_locs[marker["MessageID"]] = convert_to_vec3f(marker["Translate"])
+    return shrine_locs
+
+
+STOCK_MAP_KEYS = ["HashId", "UnitConfigName", "Translate"]
+STOCK_MAP_PARAMETERS = ["EnableRevival", "ForceFlag", "IncrementSave", "MakeSaveFlag", "SaveFlag"]
+STOCK_MAP_CACHE_VERSION = 2
+FLAG_SNAPSHOT_CACHE_VERSION = 2
+FLAG_SNAPSHOT_CACHE_SIZE = 4
+# stored in every snapshot, so snapshots pickled by other versions aren't loaded
+FLAG_SNAPSHOT_TAG = f"{VERSION}/{FLAG_SNAPSHOT_CACHE_VERSION}"
+
+
+def get_cache_dir() -> Path:
+    cache_dir = bcmlutil.get_data_dir() / "botw_flag_util"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def get_game_version() -> str:
+    version = "wiiu" if bcmlutil.get_settings("wiiu") else "switch"
+    try:
+        bcmlutil.get_aoc_dir()
+        version += "_aoc"
+    except FileNotFoundError:
+        pass
+    return version
+
+
+def get_stock_map_cache_dir() -> Path:
+    if not hasattr(get_stock_map_cache_dir, "_cache_dir"):
+        cache_dir = (
+            get_cache_dir() / f"stock_maps_v{STOCK_MAP_CACHE_VERSION}" / get_game_version()
+        )
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        get_stock_map_cache_dir._cache_dir = cache_dir  # type:ignore[attr-defined]
+    return get_stock_map_cache_dir._cache_dir  # type:ignore[attr-defined]
+
+
+def compact_stock_map(stock_map: oead.byml.Hash) -> oead.byml.Hash:
+    """Strips a map down to the object properties read during flag generation"""
+    objs = oead.byml.Array()
+    for obj in stock_map["Objs"]:
+        compact_obj = oead.byml.Hash()
+        for key in STOCK_MAP_KEYS:
+            compact_obj[key] = obj[key]
+        if "!Parameters" in obj:
+            compact_obj["!Parameters"] = oead.byml.Hash(
+                {
+                    key: obj["!Parameters"][key]
+                    for key in STOCK_MAP_PARAMETERS
+                    if key in obj["!Parameters"]
+                }
+            )
+        objs.append(compact_obj)
+    return oead.byml.Hash({"Objs": objs})
+
+
+def get_stock_map_source(map_section: tuple) -> Path:
+    """Returns the game file that the stock map of a MainField section is read from"""
+    try:
+        return bcmlutil.get_aoc_dir() / "Pack" / "AocMainField.pack"
+    except FileNotFoundError:
+        return bcmlutil.get_game_file(
+            f"Map/MainField/{map_section[0]}/{map_section[0]}_{map_section[1]}.smubin"
+        )
+
+
+def get_source_stamp(source: Path) -> str:
+    """Returns the size and mtime of a game file, which change when the dump is updated"""
+    stat = source.stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def get_cached_stock_map(name: str, stamp: str) -> Union[oead.byml.Hash, None]:
+    """Returns a cached stock map, unless it was cached from a different version of its source"""
+    cache_path = get_stock_map_cache_dir() / f"{name}.byml"
+    if not cache_path.exists():
+        return None
+    stock_map = oead.byml.from_binary(cache_path.read_bytes())
+    if not stock_map.get("SourceStamp") == stamp:
+        return None
+    return stock_map
+
+
+def cache_stock_map(name: str, stock_map: oead.byml.Hash, stamp: str) -> oead.byml.Hash:
+    compact_map = compact_stock_map(stock_map)
+    compact_map["SourceStamp"] = stamp
+    cache_path = get_stock_map_cache_dir() / f"{name}.byml"
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(oead.byml.to_binary(compact_map, False))
+    tmp_path.replace(cache_path)
+    return compact_map
+
+
+def get_stock_map_stamp(map_section: tuple) -> str:
+    """Returns the source stamp of the stock map of a MainField section"""
+    try:
+        return get_source_stamp(get_stock_map_source(map_section))
+    except FileNotFoundError:
+        # bcml looks in more places than get_stock_map_source, so let it try
+        return ""
+
+
+def get_stock_dungeon_stamp(map_pack: Path) -> str:
+    """Returns the source stamp of the stock version of a Dungeon pack"""
+    try:
+        return get_source_stamp(bcmlutil.get_game_file(map_pack))
+    except FileNotFoundError:
+        return ""
+
+
+def get_stock_map(map_section: tuple) -> oead.byml.Hash:
+    name = f"{map_section[0]}_{map_section[1]}"
+    stamp = get_stock_map_stamp(map_section)
+    stock_map = get_cached_stock_map(name, stamp)
+    if stock_map is None:
+        stock_map = cache_stock_map(name, mubin.get_stock_map(map_section), stamp)
+    return stock_map
+
+
+def get_stock_dungeon_maps(map_pack: Path, map_names: list) -> dict:
+    """
+    Returns the stock maps with the given names for a Dungeon pack,
+    or an empty dict if the pack does not exist in the game files
+    """
+    try:
+        stock_pack_path = bcmlutil.get_game_file(map_pack)
+    except FileNotFoundError:
+        return {}
+    stamp = get_source_stamp(stock_pack_path)
+    stock_maps = {name: get_cached_stock_map(name, stamp) for name in map_names}
+    if all(stock_map is not None for stock_map in stock_maps.values()):
+        return stock_maps
+    stock_pack = oead.Sarc(stock_pack_path.read_bytes())
+    for name in map_names:
+        stock_maps[name] = cache_stock_map(
+            name,
+            oead.byml.from_binary(
+                oead.yaz0.decompress(
+                    stock_pack.get_file(f"Map/CDungeon/{map_pack.stem}/{name}.smubin").data
+                )
+            ),
+            stamp,
+        )
+    return stock_maps
+
+
+def get_flag_snapshot_path(gamedata: bytes, columnar: bool) -> Path:
+    cache_dir = get_cache_dir() / f"flag_snapshots_v{FLAG_SNAPSHOT_CACHE_VERSION}"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    kind = "columnar" if columnar else "dict"
+    return cache_dir / f"{hashlib.sha1(gamedata).hexdigest()}_{kind}.pickle"
+
+
+def remove_file(path: Path) -> None:
+    """Deletes a file unless it's already gone, like Path.unlink(missing_ok=True) on Python 3.8+"""
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
 
 
-def get_last_two_savedata_files() -> list:
-    bootup_path: Path = root_dir() / "content" / "Pack" / "Bootup.pack"
-    bootup_sarc = oead.Sarc(bootup_path.read_bytes())
-    savedata_sarc = oead.Sarc(
-        oead.yaz0.decompress(bootup_sarc.get_file("GameData/savedataformat.ssarc").data)
+def get_mtime(path: Path) -> float:
+    """Returns the modification time of a file, or 0 if it can't be read"""
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+def get_cached_flag_snapshot(cache_path: Path) -> Union[dict, None]:
+    """Returns a cached snapshot, deleting the cache file if it can't be loaded"""
+    if not cache_path.exists():
+        return None
+    try:
+        cached = pickle.loads(cache_path.read_bytes())
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError):
+        # the file is truncated or damaged, or refers to classes that have since changed
+        cached = None
+    if not isinstance(cached, dict) or not cached.get("Tag") == FLAG_SNAPSHOT_TAG:
+        remove_file(cache_path)
+        return None
+    os.utime(cache_path)
+    return cached["Snapshot"]
+
+
+def cache_flag_snapshot(cache_path: Path, snapshot: dict) -> None:
+    """Saves a snapshot of a loaded FlagStore, keeping only the most recently used ones"""
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(
+        pickle.dumps({"Tag": FLAG_SNAPSHOT_TAG, "Snapshot": snapshot}, pickle.HIGHEST_PROTOCOL)
     )
-    savedata_writer = oead.SarcWriter.from_sarc(savedata_sarc)
-    idx = 0
-    files = []
-    while True:
-        try:
-            savedata_writer.files[f"/saveformat_{idx+2}.bgsvdata"]
+    tmp_path.replace(cache_path)
+    # other processes may be evicting snapshots at the same time
+    old_paths = sorted(cache_path.parent.glob("*.pickle"), key=get_mtime, reverse=True)
+    for old_path in old_paths[FLAG_SNAPSHOT_CACHE_SIZE:]:
+        remove_file(old_path)
+
+
+def parse_bgdata_file(bgdata_file: tuple) -> dict:
+    """Loads a single bgdata file into a store of its own and returns a snapshot of it"""
+    name, data, columnar = bgdata_file
+    store = FlagStore(columnar=columnar)
+    store.add_flags_from_bgdata(name, data)
+    return store.get_snapshot()
+
+
+class BootupSession:
+    """
+    Reads and parses Bootup.pack once. The gamedata and savedata archives
+    are only decompressed when first accessed, and all changed files are
+    written back to Bootup.pack at once by save(). Files passed to set_file()
+    with compress=True are compressed concurrently in a thread pool, which is
+    shut down by save() or close(), or on leaving a with block.
+
+    Without a compression_level, files are compressed at the default levels of
+    oead and bcml, as they were before the level could be set.
+    """
+
+    def __init__(self, bootup_path: Path = None, compression_level: int = None) -> None:
+        if not bootup_path:
+            bootup_path = root_dir() / "content" / "Pack" / "Bootup.pack"
+        self.path = bootup_path
+        data = bootup_path.read_bytes()
+        self.is_yaz0 = data[0:4] == b"Yaz0"
+        if self.is_yaz0:
+            data = bcmlutil.decompress(data)
+        self._data = data
+        self._sarc = oead.Sarc(self._data)
+        self._gamedata_sarc: Union[oead.Sarc, None] = None
+        self._savedata_sarc: Union[oead.Sarc, None] = None
+        self._new_files: dict = {}
+        self._executor: Union[ThreadPoolExecutor, None] = None
+        self.compression_level = compression_level
+
+    @property
+    def gamedata_sarc(self) -> oead.Sarc:
+        if not self._gamedata_sarc:
+            self._gamedata_sarc = oead.Sarc(
+                oead.yaz0.decompress(self._sarc.get_file("GameData/gamedata.ssarc").data)
+            )
+        return self._gamedata_sarc
+
+    @property
+    def savedata_sarc(self) -> oead.Sarc:
+        if not self._savedata_sarc:
+            self._savedata_sarc = oead.Sarc(
+                oead.yaz0.decompress(self._sarc.get_file("GameData/savedataformat.ssarc").data)
+            )
+        return self._savedata_sarc
+
+    def add_gamedata_flags(self, store: FlagStore, jobs: int = 1) -> None:
+        """
+        Loads the gamedata flags into an empty store. The loaded store is cached by
+        the hash of gamedata.ssarc, so an unchanged pack is only parsed once.
+        With jobs > 1, the bgdata files are parsed in a process pool.
+        """
+        cache_path = get_flag_snapshot_path(
+            self._sarc.get_file("GameData/gamedata.ssarc").data, store.columnar
+        )
+        snapshot = get_cached_flag_snapshot(cache_path)
+        if snapshot is not None:
+            store.load_snapshot(snapshot)
+            return
+        if jobs > 1 and self.gamedata_sarc.get_num_files() > 1:
+            bgdata_files = [
+                (f.name, bytes(f.data), store.columnar) for f in self.gamedata_sarc.get_files()
+            ]
+            with Pool(processes=jobs) as pool:
+                # merged in file order, so flags with the same hash resolve as in a serial load
+                for bgdata_snapshot in pool.imap(parse_bgdata_file, bgdata_files):
+                    store.add_flags_from_snapshot(bgdata_snapshot)
+        else:
+            for bgdata_file in self.gamedata_sarc.get_files():
+                store.add_flags_from_bgdata(bgdata_file.name, bytes(bgdata_file.data))
+        cache_flag_snapshot(cache_path, store.get_snapshot())
+
+    def get_last_two_savedata_files(self) -> list:
+        idx = 0
+        while self.savedata_sarc.get_file(f"/saveformat_{idx+2}.bgsvdata"):
             idx += 1
-        except KeyError:
-            files.append(savedata_writer.files[f"/saveformat_{idx}.bgsvdata"])
-            files.append(savedata_writer.files[f"/saveformat_{idx+1}.bgsvdata"])
-            return files
+        return [
+            bytes(self.savedata_sarc.get_file(f"/saveformat_{idx}.bgsvdata").data),
+            bytes(self.savedata_sarc.get_file(f"/saveformat_{idx+1}.bgsvdata").data),
+        ]
+
+    def set_file(self, name: str, data: bytes, compress: bool = False) -> None:
+        if compress:
+            if not self._executor:
+                self._executor = ThreadPoolExecutor()
+            self._new_files[name] = self._executor.submit(self._compress_file, data)
+        else:
+            self._new_files[name] = data
+
+    def _compress_file(self, data: bytes) -> oead.Bytes:
+        if self.compression_level is None:
+            return oead.yaz0.compress(data)
+        return oead.yaz0.compress(data, level=self.compression_level)
+
+    def save(self) -> None:
+        try:
+            new_sarc = oead.SarcWriter.from_sarc(self._sarc)
+            for name, data in self._new_files.items():
+                if isinstance(data, Future):
+                    data = data.result()
+                new_sarc.files[name] = data if isinstance(data, bytes) else bytes(data)
+        finally:
+            self.close()
+        new_bytes = new_sarc.write()[1]
+        del new_sarc
+        if self.is_yaz0:
+            if self.compression_level is None:
+                new_bytes = bcmlutil.compress(new_bytes)
+            else:
+                new_bytes = oead.yaz0.compress(new_bytes, level=self.compression_level)
+        self.path.write_bytes(new_bytes)
+
+    def close(self) -> None:
+        """Discards any unsaved files and shuts down the compression threads"""
+        for data in self._new_files.values():
+            if isinstance(data, Future):
+                data.cancel()
+        self._new_files = {}
+        if self._executor:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> "BootupSession":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def make_bgdata_file(data_type: str, flags: list, big_endian: bool) -> bytes:
+    return byml.to_binary({data_type: [flag.to_record() for flag in flags]}, big_endian)
+
+
+def make_svdata_file(flags: list, num_files: int, big_endian: bool) -> bytes:
+    return byml.to_binary(
+        {
+            "file_list": [
+                {
+                    "IsCommon": False,
+                    "IsCommonAtSameAccount": False,
+                    "IsSaveSecureCode": True,
+                    "file_name": "game_data.sav",
+                },
+                [flag.to_sv_record() for flag in flags],
+            ],
+            "save_info": [
+                {"directory_num": num_files + 2, "is_build_machine": True, "revision": 18203}
+            ],
+        },
+        big_endian,
+    )
 
 
 def make_new_gamedata(store: FlagStore, big_endian: bool) -> bytes:
@@ -119,15 +440,11 @@ def make_new_gamedata(store: FlagStore, big_endian: bool) -> bytes:
         endian=oead.Endianness.Big if big_endian else oead.Endianness.Little
     )
     for prefix, data_type in BGDATA_MAPPING.items():
-        bgdata_array = store.flags_to_bgdata_Array(prefix)
-        num_files = ceil(len(bgdata_array) / 4096)
+        flags = store.get_bgdata_flags(prefix)
+        num_files = ceil(len(flags) / 4096)
         for idx in range(num_files):
-            start = idx * 4096
-            end = (idx + 1) * 4096
-            if end > len(bgdata_array):
-                end = len(bgdata_array)
-            bgwriter.files[f"/{prefix}_{idx}.bgdata"] = oead.byml.to_binary(
-                oead.byml.Hash({data_type: bgdata_array[start:end]}), big_endian,
+            bgwriter.files[f"/{prefix}_{idx}.bgdata"] = make_bgdata_file(
+                data_type, flags[idx * 4096 : (idx + 1) * 4096], big_endian
             )
     return bgwriter.write()[1]
 
@@ -136,69 +453,17 @@ def make_new_savedata(store: FlagStore, big_endian: bool, orig_files: list) -> b
     svwriter = oead.SarcWriter(
         endian=oead.Endianness.Big if big_endian else oead.Endianness.Little
     )
-    svdata_array = store.flags_to_svdata_Array()
-    num_files = ceil(len(svdata_array) / 8192)
+    flags = store.get_svdata_flags()
+    num_files = ceil(len(flags) / 8192)
     for idx in range(num_files):
-        start = idx * 8192
-        end = (idx + 1) * 8192
-        if end > len(svdata_array):
-            end = len(svdata_array)
-        svwriter.files[f"/saveformat_{idx}.bgsvdata"] = oead.byml.to_binary(
-            oead.byml.Hash(
-                {
-                    "file_list": oead.byml.Array(
-                        [
-                            {
-                                "IsCommon": False,
-                                "IsCommonAtSameAccount": False,
-                                "IsSaveSecureCode": True,
-                                "file_name": "game_data.sav",
-                            },
-                            oead.byml.Array(svdata_array[start:end]),
-                        ]
-                    ),
-                    "save_info": oead.byml.Array(
-                        [
-                            {
-                                "directory_num": oead.S32(num_files + 2),
-                                "is_build_machine": True,
-                                "revision": oead.S32(18203),
-                            }
-                        ]
-                    ),
-                }
-            ),
-            big_endian,
+        svwriter.files[f"/saveformat_{idx}.bgsvdata"] = make_svdata_file(
+            flags[idx * 8192 : (idx + 1) * 8192], num_files, big_endian
         )
     svwriter.files[f"/saveformat_{num_files}.bgsvdata"] = orig_files[0]
     svwriter.files[f"/saveformat_{num_files+1}.bgsvdata"] = orig_files[1]
     return svwriter.write()[1]
 
 
-def inject_files_into_bootup(files: list, datas: list):
-    bootup_path: Path = root_dir() / "content" / "Pack" / "Bootup.pack"
-    sarc_data = bootup_path.read_bytes()
-    yaz = sarc_data[0:4] == b"Yaz0"
-    if yaz:
-        sarc_data = bcmlutil.decompress(sarc_data)
-    old_sarc = oead.Sarc(sarc_data)
-    del sarc_data
-    new_sarc = oead.SarcWriter.from_sarc(old_sarc)
-    del old_sarc
-    for idx in range(len(files)):
-        new_sarc.files[files[idx]] = (
-            datas[idx] if isinstance(datas[idx], bytes) else bytes(datas[idx])
-        )
-    new_bytes = new_sarc.write()[1]
-    del new_sarc
-    bootup_path.write_bytes(new_bytes if not yaz else bcmlutil.compress(new_bytes))
-    del new_bytes
-
-
-def unpack_oead_file(f: oead.File) -> tuple:
-    return (f.name, oead.byml.from_binary(f.data))
-
-
 def get_verbose_output(store: FlagStore) -> str:
     r: list = []
     for ftype in BGDATA_TYPES:
@@ -0,0 +1 @@
+# keeps the repository root on sys.path, so the tests can import benchmarks._fixtures
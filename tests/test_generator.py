@@ -0,0 +1,37 @@
+import oead
+
+from botw_flag_util import byml
+from botw_flag_util.generator import FlagGenerator
+
+# far from every vanilla shrine, and next to the DLC shrine that each mod adds at SHRINE
+LINK_TAG_POSITION = [0.0, 0.0, 0.0]
+SHRINE = {"X": 10.0, "Y": 0.0, "Z": 10.0}
+
+
+def make_map(*objs: dict) -> oead.byml.Hash:
+    return oead.byml.from_binary(byml.to_binary({"Objs": list(objs)}, big_endian=False))
+
+
+def add_dlc_shrine(moddir, name: str) -> None:
+    static_path = moddir / "aoc/0010/Map/MainField/Static.smubin"
+    static_path.parent.mkdir(parents=True)
+    marker = {"Icon": "Dungeon", "MessageID": name, "SaveFlag": f"Open_{name}", "Translate": SHRINE}
+    static_path.write_bytes(
+        oead.yaz0.compress(byml.to_binary({"LocationMarker": [marker]}, big_endian=False))
+    )
+
+
+def test_generators_use_their_own_shrines(tmp_path):
+    link_tag = {
+        "HashId": 1,
+        "UnitConfigName": "LinkTagAnd",
+        "Translate": LINK_TAG_POSITION,
+        "!Parameters": {"MakeSaveFlag": 2},
+    }
+    names = []
+    for mod in ("Mod_A", "Mod_B"):
+        add_dlc_shrine(tmp_path / mod, f"Dungeon{mod}")
+        generator = FlagGenerator(tmp_path / mod)
+        ops = generator.diff_map(make_map(link_tag), make_map(), "MainField", 1)
+        names.append(ops[0][2])
+    assert names == ["Open_DungeonMod_A", "Open_DungeonMod_B"]
@@ -0,0 +1,36 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# the CLI should start well within this, even on a slow machine
+IMPORT_TIME_BUDGET_US = 250_000
+
+
+def get_import_times(module: str) -> dict:
+    """Returns the cumulative import time in microseconds of every module imported by a module"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_import_time():
+    times = get_import_times("botw_flag_util.__main__")
+    assert times["botw_flag_util.__main__"] < IMPORT_TIME_BUDGET_US
+
+
+def test_cli_import_defers_heavy_modules():
+    times = get_import_times("botw_flag_util.__main__")
+    for module in ("bcml", "oead", "botw_flag_util.override"):
+        assert module not in times
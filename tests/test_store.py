@@ -0,0 +1,71 @@
+from oead.byml import from_binary
+
+from benchmarks._fixtures import make_bgdata, make_bool_record
+from botw_flag_util.columns import FlagColumns
+from botw_flag_util.flag import BoolFlag
+from botw_flag_util.hashing import get_flag_hash
+from botw_flag_util.store import INDEX_MIN_SEARCHES, FlagStore
+
+
+def test_mismatched_hashes_are_changes():
+    data = make_bgdata(
+        [
+            make_bool_record("Good_Flag"),
+            make_bool_record("Bad_Flag", get_flag_hash("Bad_Flag") + 1),
+        ]
+    )
+    loaders = [
+        (False, lambda store: store.add_flags_from_bgdata("bool_data_0", data)),
+        (True, lambda store: store.add_flags_from_bgdata("bool_data_0", data)),
+        (True, lambda store: store.add_flags_from_Hash("bool_data_0", from_binary(data))),
+        (
+            True,
+            lambda store: store.add_flags_from_Hash_no_overwrite("bool_data_0", from_binary(data)),
+        ),
+    ]
+    for columnar, load in loaders:
+        store = FlagStore(columnar=columnar)
+        load(store)
+        assert store.get_new_ftype("bool_data") == {"Bad_Flag"}
+        assert store.get_deleted_ftype("bool_data") == {"Bad_Flag"}
+        assert store.get_num_modified() == 0
+
+
+def test_reloaded_rows_replace_built_flags():
+    hash = get_flag_hash("Some_Flag")
+    base = FlagColumns(BoolFlag)
+    base.load_records([make_bool_record("Some_Flag", init_value=0)], False)
+    columns = FlagColumns(BoolFlag, base=base)
+    columns.add_base_rows(base, 0)
+    assert base[hash].init_value == columns[hash].init_value == 0
+
+    start = base.row_count
+    base.load_records([make_bool_record("Some_Flag", init_value=1)], False)
+    columns.add_base_rows(base, start)
+    assert base[hash].init_value == columns[hash].init_value == 1
+
+
+def test_queued_searches_match_scans():
+    names = [
+        f"{prefix}_{idx}"
+        for prefix in ("Open_Door", "Clear_Dungeon", "IsGet_Item")
+        for idx in range(50)
+    ]
+    data = make_bgdata([make_bool_record(name) for name in names])
+    results = []
+    for queued in (0, INDEX_MIN_SEARCHES):
+        store = FlagStore(columnar=True)
+        store.add_flags_from_bgdata("bool_data_0", data)
+        new_flag = BoolFlag()
+        new_flag.data_name = "Open_Door_New"
+        store.add("bool_data", new_flag)
+        store.queue_searches(queued)
+        results.append(
+            (
+                store.find_all_hashes("bool_data", "Door_1"),
+                [flag.data_name for flag in store.find_all_prefix("bool_data", "Clear_")],
+                [flag.data_name for flag in store.find_all_regex("bool_data", r"_Item_\d$")],
+                store.find_all_hashes("bool_data", "New"),
+            )
+        )
+    assert results[0] == results[1]